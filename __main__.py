@@ -1,103 +1,299 @@
 import os
-from typing import Any
-from atp import Player, get_ranking_top_100_for_date, get_players
-from chart import Chart, Map
-from page1_ranking import page1_ranking
-from page2_game_set_match import page2_game_set_match
-from page3_game_set_match_2 import page3_game_set_match_2
-from page4_map import page4_map
-from page5_body import page5_body
-from page6_income import page6_income
-from page7_fin import page7_fin
+import json
+import time
+import argparse
+from typing import TYPE_CHECKING, Any, Literal
+from dataclasses import dataclass
+from atp import (
+    Date,
+    Player,
+    PlayerRow,
+    get_rankings,
+    get_players,
+    get_player_registry,
+    get_rank_matrix,
+    get_ranking_from_history,
+    get_cached_rank_history_ids,
+    parse_date,
+    to_date,
+)
+from manifest import BuildManifest, get_page_hash
+
+# Pages, charts (matplotlib) and the browser (Playwright) are imported
+# in the stage that uses them, so that '--data-only' starts fast.
+if TYPE_CHECKING:
+    from chart import Chart, Map
 
 _PLAYER_COUNT = 50
 # Day has to be one of the days the ranking is published.
 # Go https://www.atptour.com/en/rankings/singles and use the date combo box.
 _RANKING_NOW_DAY = "2024-12-30"
 _RANKING_PAST_DAY = "2024-01-01"
-_RANKING_NOW_DATE = f"{_RANKING_NOW_DAY}T00:00:00"
-_RANKING_PAST_DATE = f"{_RANKING_PAST_DAY}T00:00:00"
 _IMAGE_WIDTH = 1200
+_PADDING_X = 10
+_CHART_WIDTH = _IMAGE_WIDTH - 2 * _PADDING_X
 _OUTPUT_DIR_PATH = "output"
 _ASSETS_DIR_PATH = "assets"
-
-
-def main():
-    players = _get_ranking(_RANKING_NOW_DAY)
-    players_past = _get_ranking(_RANKING_PAST_DAY)
+_MANIFEST_PATH = os.path.join(_ASSETS_DIR_PATH, "build_manifest.json")
+
+ChartFormat = Literal["png", "svg"]
+"png: 'assets/*_chart_N.png' files, svg: markup inlined in the html."
+
+
+@dataclass
+class Edition:
+    "Single set of pages, see 'editions.json' for the config file."
+
+    ranking_now_day: str
+    "Day has to be one of the days the ranking is published."
+    ranking_past_day: str
+    player_count: int = _PLAYER_COUNT
+    name: str = ""
+    "Files: 'output/{name}/*.png' and 'assets/{name}_*'. Empty: no prefix."
+
+    award_count_rank_gain_lose: int = 5
+    award_count_spread: int = 5
+    top_N: int = 10
+    award_count_unlucky: int = 5
+    award_count_highest_defeated: int = 5
+    award_count_game_count: int = 6
+    award_count_best_countries: int = 3
+    award_count_best_player_per_continent: int = 6
+    award_count_age: int = 5
+    award_count_height: int = 3
+    award_count_weight: int = 4
+
+    @property
+    def ranking_now_date(self) -> Date:
+        return parse_date(self.ranking_now_day)
+
+    @property
+    def ranking_past_date(self) -> Date:
+        return parse_date(self.ranking_past_day)
+
+    @property
+    def stats_season(self) -> int:
+        return to_date(self.ranking_now_date).year
+
+
+def main(
+    player_count: int = _PLAYER_COUNT,
+    chart_format: ChartFormat = "png",
+    data_only: bool = False,
+    rankings_from_history: bool = False,
+):
+    edition = Edition(_RANKING_NOW_DAY, _RANKING_PAST_DAY, player_count)
+    main_batch([edition], chart_format, data_only, rankings_from_history)
+
+
+def main_batch(
+    editions: list[Edition],
+    chart_format: ChartFormat = "png",
+    data_only: bool = False,
+    rankings_from_history: bool = False,
+):
+    """
+    Players from all of the editions are loaded once, so the parsed data
+    and the caches (seasons, head to head etc.) are shared between them.
+    'data_only' loads (and caches) the data without rendering anything.
+    'rankings_from_history': see '_get_rankings'.
+    """
+    names = [e.name for e in editions]
+    assert len(set(names)) == len(names), "Edition names have to be unique"
+
+    rankings = _get_rankings(editions, rankings_from_history)
+
+    if data_only:
+        player_ids = {p.id for players in rankings.values() for p in players}
+        print(f"Loaded {len(rankings)} rankings, {len(player_ids)} players")
+        return
+
+    # Unchanged charts and images (same input hash) are not written again.
+    manifest = BuildManifest(_MANIFEST_PATH)
+    pages = list[_RenderedPage]()
+
+    for e in editions:
+        if e.name:
+            print(f"Edition {e.name}")
+
+        players = rankings[(e.ranking_now_day, e.player_count)]
+        players_past = rankings[(e.ranking_past_day, e.player_count)]
+        edition_pages = _render_edition(e, players, players_past, chart_format)
+
+        # Charts of an edition are written (and their figures closed) before
+        # the next one is rendered: only one edition of figures is open.
+        _write_charts(edition_pages, manifest)
+        pages += edition_pages
+
+    _save_images(pages, manifest)
+
+
+@dataclass
+class _RenderedPage:
+    html_path: str
+    html_url: str
+    image_path: str
+    chart_path_to_chart: "dict[str, Chart | Map]"
+    "Charts are written after the edition is rendered (see '_write_charts')."
+
+
+def _render_edition(
+    e: Edition,
+    players: list[Player],
+    players_past: list[Player],
+    chart_format: ChartFormat,
+) -> list[_RenderedPage]:
+    """
+    Charts and images are written later, see 'main_batch'.
+    Ranks are from the rank histories at 'ranking_now_day', not from the
+    current player profiles (they may be years newer than the edition).
+    """
+    from page1_ranking import page1_ranking
+    from page2_game_set_match import page2_game_set_match
+    from page3_game_set_match_2 import page3_game_set_match_2
+    from page4_map import page4_map
+    from page5_body import page5_body
+    from page6_income import page6_income
+    from page7_fin import page7_fin
+
+    result = list[_RenderedPage]()
+    # Past players too: their rank now is on page 1.
+    id_to_player = {p.id: p for p in players + players_past}
+    matrix = get_rank_matrix(list(id_to_player.values()))
+    ranks = matrix.get_ranks(e.ranking_now_date)
+    assert all(p.id in ranks for p in players), f"{e.name}: unranked players"
+
+    def render(template_name: str, context: Any, image_name: str):
+        page = render_template(
+            template_name,
+            context,
+            image_name,
+            e,
+            ranks,
+            chart_format,
+        )
+        result.append(page)
 
     print("1 Ranking")
     data = page1_ranking(
-        date_past=_RANKING_PAST_DATE,
+        date_past=e.ranking_past_date,
         ranking_past=players_past,
-        date_now=_RANKING_NOW_DATE,
+        date_now=e.ranking_now_date,
         ranking_now=players,
-        award_count_rank_gain_lose=5,
-        award_count_spread=5,
+        ranks=ranks,
+        award_count_rank_gain_lose=e.award_count_rank_gain_lose,
+        award_count_spread=e.award_count_spread,
     )
-    render_template("page1_ranking.html", data, "1_ranking.png")
+    render("page1_ranking.html", data, "1_ranking.png")
 
     print("2 Game, set, match")
     data = page2_game_set_match(
         players,
-        date_from=_RANKING_PAST_DATE,
-        top_N=10,
-        award_count_unlucky=5,
+        ranks,
+        date_from=e.ranking_past_date,
+        date_to=e.ranking_now_date,
+        top_N=e.top_N,
+        award_count_unlucky=e.award_count_unlucky,
     )
-    render_template("page2_game_set_match.html", data, "2_game_set_match.png")
+    render("page2_game_set_match.html", data, "2_game_set_match.png")
 
     print("3 Game, set, match 2")
     data = page3_game_set_match_2(
         players,
-        date_from=_RANKING_PAST_DATE,
-        award_count_highest_defeated=5,
-        award_count_game_count=6,
+        ranks,
+        date_from=e.ranking_past_date,
+        date_to=e.ranking_now_date,
+        award_count_highest_defeated=e.award_count_highest_defeated,
+        award_count_game_count=e.award_count_game_count,
     )
-    render_template("page3_game_set_match_2.html", data, "3_game_set_match_2.png")
+    render("page3_game_set_match_2.html", data, "3_game_set_match_2.png")
 
     print("4 Map")
     data = page4_map(
         players,
-        award_count_best_countries=3,
-        award_count_best_player_per_continent=6,
+        ranks,
+        award_count_best_countries=e.award_count_best_countries,
+        award_count_best_player_per_continent=e.award_count_best_player_per_continent,
     )
-    render_template("page4_map.html", data, "4_map.png")
+    render("page4_map.html", data, "4_map.png")
 
     print("5 Body")
     data = page5_body(
         players,
-        award_count_age=5,
-        award_count_height=3,
-        award_count_weight=4,
+        ranks,
+        date_now=e.ranking_now_date,
+        award_count_age=e.award_count_age,
+        award_count_height=e.award_count_height,
+        award_count_weight=e.award_count_weight,
     )
-    render_template("page5_body.html", data, "5_body.png")
+    render("page5_body.html", data, "5_body.png")
 
     print("6 Income")
-    data = page6_income(players)
-    render_template("page6_income.html", data, "6_income.png")
+    data = page6_income(
+        players,
+        ranks,
+        date_from=e.ranking_past_date,
+        date_to=e.ranking_now_date,
+        stats_season=e.stats_season,
+    )
+    render("page6_income.html", data, "6_income.png")
 
     print("7 Fin")
-    data = page7_fin(players, date_from=_RANKING_PAST_DATE)
-    render_template("page7_fin.html", data, "7_fin.png")
+    data = page7_fin(
+        players,
+        date_from=e.ranking_past_date,
+        date_to=e.ranking_now_date,
+    )
+    render("page7_fin.html", data, "7_fin.png")
+
+    return result
+
 
+def render_template(
+    template_name: str,
+    context: Any,
+    image_name: str,
+    edition: Edition,
+    ranks: dict[str, int],
+    chart_format: ChartFormat = "png",
+) -> _RenderedPage:
+    """
+    Write html. Charts and image are written later,
+    see '_write_charts' and '_save_images'.
+    Svg charts are drawn right away, they are a part of the html.
+    'ranks' (player id -> rank) are shown next to the players.
+    """
+    from markupsafe import Markup
+    from chart import Chart, Map
 
-def render_template(template_name: str, context: Any, image_name: str):
     tmp_dir_path = _ASSETS_DIR_PATH
-    os.makedirs(_OUTPUT_DIR_PATH, exist_ok=True)
+    output_dir_path = os.path.join(_OUTPUT_DIR_PATH, edition.name)
+    os.makedirs(output_dir_path, exist_ok=True)
     os.makedirs(tmp_dir_path, exist_ok=True)
 
-    # Change chart to its path
-    padding_x = 10
-    context_dict: dict[str, Any] = {"width": _IMAGE_WIDTH, "padding_x": padding_x}
+    # Html has to be in 'assets' (css, fonts), so the edition is a file prefix.
+    output_image_name = image_name
+
+    if edition.name:
+        image_name = f"{edition.name}_{image_name}"
+
+    # Change chart to its path (or svg markup)
+    context_dict: dict[str, Any] = {
+        "width": _IMAGE_WIDTH,
+        "padding_x": _PADDING_X,
+        "ranks": ranks,
+    }
     image_name_without_extension, _ = os.path.splitext(image_name)
     chart_index = 1
-    chart_width = _IMAGE_WIDTH - 2 * padding_x
+    chart_path_to_chart = dict[str, Chart | Map]()
 
     for name, o in vars(context).items():
-        if isinstance(o, Chart | Map):
+        if isinstance(o, Chart | Map) and chart_format == "svg":
+            o = Markup(o.get_svg(width=_CHART_WIDTH))
+        elif isinstance(o, Chart | Map):
             chart_img_name = f"{image_name_without_extension}_chart_{chart_index}.png"
             chart_img_path = os.path.join(tmp_dir_path, chart_img_name)
-            o.write_img(chart_img_path, width=chart_width)
+            chart_path_to_chart[chart_img_path] = o
 
             o = os.path.realpath(chart_img_path)
             chart_index += 1
@@ -105,13 +301,9 @@ def render_template(template_name: str, context: Any, image_name: str):
         context_dict[name] = o
 
     # Write html
-    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    from templates import get_template_environment
 
-    env = Environment(
-        loader=FileSystemLoader("."),
-        autoescape=select_autoescape(),
-    )
-    template = env.get_template(template_name)
+    template = get_template_environment().get_template(template_name)
     html = template.render(context_dict)
 
     html_name = image_name_without_extension + ".html"
@@ -120,35 +312,240 @@ def render_template(template_name: str, context: Any, image_name: str):
     with open(html_path, "w", encoding="utf-8") as f:
         f.write(html)
 
-    # Render image
-    from browser import save_png
-
     html_url = "file:" + os.path.realpath(html_path)
-    image_path = os.path.realpath(os.path.join(_OUTPUT_DIR_PATH, image_name))
-    save_png(html_url, image_path, width=_IMAGE_WIDTH)
+    image_path = os.path.realpath(os.path.join(output_dir_path, output_image_name))
+    return _RenderedPage(html_path, html_url, image_path, chart_path_to_chart)
 
 
-def _get_ranking(day: str) -> list[Player]:
-    print(f"Reading TOP {_PLAYER_COUNT} for {day}")
+def _write_charts(pages: list[_RenderedPage], manifest: BuildManifest):
+    "All of the charts are drawn in a process pool."
+    from chart import Chart, Map, write_imgs
+
+    path_to_chart = dict[str, Chart | Map]()
+    path_to_hash = dict[str, str]()
+    unchanged_count = 0
+
+    for page in pages:
+        for path, chart in page.chart_path_to_chart.items():
+            hash = chart.get_input_hash(_CHART_WIDTH)
+
+            if manifest.is_up_to_date(path, hash):
+                unchanged_count += 1
+
+                if isinstance(chart, Chart):
+                    chart.close()
+            else:
+                path_to_chart[path] = chart
+                path_to_hash[path] = hash
+
+    print(f"Writing {len(path_to_chart)} charts ({unchanged_count} unchanged)")
+    start = time.perf_counter()
+    results = write_imgs(path_to_chart, width=_CHART_WIDTH)
+    errors = list[str]()
+
+    for r in results:
+        name = os.path.basename(r.path)
+        status = "" if r.error is None else f" FAILED: {r.error}"
+        print(f"  {name}: {r.duration:.2f}s{status}")
+
+        if r.error is None:
+            manifest.set(r.path, path_to_hash[r.path])
+        else:
+            errors.append(f"{name}: {r.error}")
+
+    manifest.save()
+    print(f"  Total: {time.perf_counter() - start:.2f}s")
+    assert not errors, "Unable to write charts: " + ", ".join(errors)
+
+
+def _save_images(pages: list[_RenderedPage], manifest: BuildManifest):
+    "All of the pages are rendered concurrently in a single browser."
+    from browser import save_pngs
+
+    html_url_to_image_path = dict[str, str]()
+    image_path_to_hash = dict[str, str]()
+    unchanged_count = 0
+
+    for p in pages:
+        # Charts are already written: their content is a part of the hash.
+        hash = get_page_hash(p.html_path, _IMAGE_WIDTH)
+
+        if manifest.is_up_to_date(p.image_path, hash):
+            unchanged_count += 1
+        else:
+            html_url_to_image_path[p.html_url] = p.image_path
+            image_path_to_hash[p.image_path] = hash
+
+    count = len(html_url_to_image_path)
+    print(f"Rendering {count} images ({unchanged_count} unchanged)")
+    start = time.perf_counter()
+    url_to_duration = save_pngs(html_url_to_image_path, width=_IMAGE_WIDTH)
+
+    for url, duration in url_to_duration.items():
+        image_path = html_url_to_image_path[url]
+        manifest.set(image_path, image_path_to_hash[image_path])
+        print(f"  {os.path.basename(image_path)}: {duration:.2f}s")
+
+    manifest.save()
+    print(f"  Total: {time.perf_counter() - start:.2f}s")
+
+
+def _get_rankings(
+    editions: list[Edition],
+    from_history: bool = False,
+) -> dict[tuple[str, int], list[Player]]:
+    """
+    (day, player_count) -> players sorted by rank.
+
+    'from_history': only the newest ranking of every player count is fetched,
+    the older ones are reconstructed from the rank histories of the players
+    from the newest ranking and the cache. Ranking page is fetched only if
+    they do not cover the whole TOP (e.g. first run with an empty cache).
+    """
+    count_to_days = dict[int, list[str]]()
+
+    for e in editions:
+        days = count_to_days.setdefault(e.player_count, [])
+        days += (e.ranking_now_day, e.ranking_past_day)
+
+    count_to_days = {c: list(dict.fromkeys(days)) for c, days in count_to_days.items()}
+
+    if from_history:
+        result = _read_rankings_from_history(count_to_days)
+    else:
+        result = _read_rankings(count_to_days)
+
+    # Stats only of the season of the edition: a player of a newer edition
+    # may have no stats for the season of an older one.
+    for e in editions:
+        players = result[(e.ranking_now_day, e.player_count)]
+        get_players([p.id for p in players], [e.stats_season])
 
-    rows_all = get_ranking_top_100_for_date(day)
-    assert len(rows_all) == 100
+    return result
 
-    rows_all.sort(key=lambda r: r.rank)
-    rows = rows_all[:_PLAYER_COUNT]
 
-    player_ids = [r.id for r in rows]
-    players = get_players(player_ids)
+def _read_rankings_from_history(
+    count_to_days: dict[int, list[str]],
+) -> dict[tuple[str, int], list[Player]]:
+    newest = {c: [max(days)] for c, days in count_to_days.items()}
+    result = _read_rankings(newest)
 
-    result = list[Player]()
-    id_to_player = {p.id: p for p in players}
+    # Not only the newest TOP: players of the older rankings may have dropped
+    # out of it. Everyone with a cached rank history (from any previous run).
+    player_ids = [p.id for p in get_player_registry()]
+    player_ids += get_cached_rank_history_ids()
+    loaded = get_players(list(dict.fromkeys(player_ids)), [])
+    count_to_missing_days = dict[int, list[str]]()
+
+    for count, days in count_to_days.items():
+        for day in days:
+            if (day, count) in result:
+                continue
 
-    for r in rows:
-        p = id_to_player[r.id]
-        result.append(p)
+            date = parse_date(day)
+            players = get_ranking_from_history(loaded, date, count)
 
+            if players is None:
+                count_to_missing_days.setdefault(count, []).append(day)
+            else:
+                print(f"TOP {count} for {day} without fetching the ranking")
+                result[(day, count)] = players
+
+    result.update(_read_rankings(count_to_missing_days))
     return result
 
 
+def _read_rankings(
+    count_to_days: dict[int, list[str]],
+) -> dict[tuple[str, int], list[Player]]:
+    "Fetch the ranking pages, then load all of the players at once."
+    key_to_rows = dict[tuple[str, int], list[PlayerRow]]()
+
+    for count, days in count_to_days.items():
+        print(f"Reading TOP {count} for {', '.join(days)}")
+
+        for day, rows in get_rankings(days, count).items():
+            assert len(rows) == count
+            key_to_rows[(day, count)] = rows
+
+    # Union of all of the rankings: every player is loaded only once.
+    rows_all = (r for rows in key_to_rows.values() for r in rows)
+    player_ids = list(dict.fromkeys(r.id for r in rows_all))
+    players = get_players(player_ids, [])
+    id_to_player = {p.id: p for p in players}
+
+    return {
+        key: [id_to_player[r.id] for r in rows]
+        for key, rows in key_to_rows.items()
+    }
+
+
+def _read_editions(path: str) -> list[Edition]:
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    return [Edition(**e) for e in config["editions"]]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--player-count",
+        type=int,
+        default=_PLAYER_COUNT,
+        help=f"Players from the TOP of the ranking (default: {_PLAYER_COUNT}).",
+    )
+    group.add_argument(
+        "--config",
+        help="Render all of the editions from a config file, see 'editions.json'.",
+    )
+    parser.add_argument(
+        "--chart-format",
+        choices=["png", "svg"],
+        default="png",
+        help="png: separate chart images, svg: charts inlined in the html.",
+    )
+    parser.add_argument(
+        "--rankings-from-history",
+        action="store_true",
+        help="Fetch only the newest ranking, reconstruct the older ones "
+        "from the rank histories of the loaded players (useful with '--config').",
+    )
+    parser.add_argument(
+        "--data-only",
+        action="store_true",
+        help="Load the rankings and the players (fetch what is missing) and exit.",
+    )
+    group.add_argument(
+        "--precompile-templates",
+        action="store_true",
+        help="Compile all of the templates into the bytecode cache and exit.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = _parse_args()
+
+    if args.precompile_templates:
+        from templates import precompile_templates
+
+        start = time.perf_counter()
+        names = precompile_templates()
+        print(f"Compiled {len(names)} templates: {time.perf_counter() - start:.2f}s")
+    elif args.config:
+        editions = _read_editions(args.config)
+        main_batch(
+            editions,
+            args.chart_format,
+            args.data_only,
+            args.rankings_from_history,
+        )
+    else:
+        main(
+            args.player_count,
+            args.chart_format,
+            args.data_only,
+            args.rankings_from_history,
+        )
@@ -1,7 +1,20 @@
-from atp.ranking import get_ranking_top_100, get_ranking_top_100_for_date
-from atp.player_stats import PlayerStats_Service, PlayerStats_Return
+from atp.ranking import (
+    PlayerRow,
+    get_ranking,
+    get_rankings,
+    get_cached_ranking,
+    get_ranking_top_100,
+    get_ranking_top_100_for_date,
+)
+from atp.player_stats import (
+    PlayerStats_Service,
+    PlayerStats_Return,
+    PlayerStatsMatrix,
+    get_players_stats_matrix,
+)
 from atp.player_activity import PlayerTournament
-from atp.player_rank_history import PlayerRank
+from atp.tournament import Tournament, TournamentCatalog, get_tournament_catalog
+from atp.player_rank_history import PlayerRank, get_cached_rank_history_ids
 from atp.player_activity import (
     PlayerTournament,
     PlayerMatch_Round,
@@ -14,12 +27,22 @@ from atp.player_activity import (
     PlayerMatch_Walkover,
     PlayerMatch_Retire,
     PlayerMatch_Default,
+    OpponentRegistry,
+    get_opponent_registry,
 )
 from atp.countries import Country, Continent, get_all_countries, get_all_continents
+from atp.dates import Date, parse_date, to_date, format_date, format_date_short
+from atp.rank_matrix import RankMatrix
 
-from typing import Literal as _Literal, assert_never as _assert_never
+import warnings as _warnings
+from bisect import bisect_left as _bisect_left
+from typing import (
+    Literal as _Literal,
+    assert_never as _assert_never,
+)
 from atp.player_data import PlayerData as _PlayerData
 from atp.json_dict import JSONDict as _JSONDict
+from atp.registry import Registry as _Registry
 
 
 class Player(_PlayerData):
@@ -28,19 +51,82 @@ class Player(_PlayerData):
         self,
         id: str,
         json: _JSONDict,
-        ytd_stats_service: PlayerStats_Service,
-        ytd_stats_return: PlayerStats_Return,
+        season_to_stats: dict[int, tuple[PlayerStats_Service, PlayerStats_Return]],
         career_tournaments: list[PlayerTournament],
         career_rank_history: list[PlayerRank],
     ) -> None:
         super().__init__(id, json)
-        self.ytd_stats_service = ytd_stats_service
-        self.ytd_stats_return = ytd_stats_return
+        self.season_to_stats = season_to_stats
         self.career_tournaments = career_tournaments
         self.career_rank_history = career_rank_history
         self._date_to_rank = {r.date: r for r in career_rank_history}
+        self._rank_dates = [r.date for r in career_rank_history]
+        self._tournament_dates = [t.date for t in career_tournaments]
+        self._tournaments_window_cache = dict[
+            tuple[Date | None, Date | None],
+            list[PlayerTournament],
+        ]()
+        self._matches_window_cache = dict[
+            tuple[Date | None, Date | None],
+            list[tuple[PlayerTournament, PlayerMatch]],
+        ]()
+
+    def get_stats(self, season: int) -> tuple[PlayerStats_Service, PlayerStats_Return]:
+        "Season has to be one of the 'stats_seasons' from 'get_players'."
+        return self.season_to_stats[season]
+
+    def get_tournaments(
+        self,
+        date_from: Date | None = None,
+        date_to: Date | None = None,
+    ) -> list[PlayerTournament]:
+        """
+        Tournaments that started in [date_from, date_to): oldest -> newest.
+        'None' means no limit. Do not modify the result, it is cached.
+        """
+        key = (date_from, date_to)
+        result = self._tournaments_window_cache.get(key)
+
+        if result is not None:
+            return result
+
+        # 'career_tournaments' are sorted by date, see 'get_players_tournaments'.
+        dates = self._tournament_dates
+        start = 0 if date_from is None else _bisect_left(dates, date_from)
+        end = len(dates) if date_to is None else _bisect_left(dates, date_to)
+
+        result = self.career_tournaments[start:end]
+        self._tournaments_window_cache[key] = result
+        return result
+
+    def get_matches(
+        self,
+        date_from: Date | None = None,
+        date_to: Date | None = None,
+    ) -> list[tuple[PlayerTournament, PlayerMatch]]:
+        """
+        Matches from the tournaments that started in [date_from, date_to).
+        Do not modify the result, it is cached.
+        """
+        key = (date_from, date_to)
+        result = self._matches_window_cache.get(key)
+
+        if result is not None:
+            return result
+
+        result = [
+            (t, m)
+            for t in self.get_tournaments(date_from, date_to)
+            for m in t.matches
+        ]
+
+        self._matches_window_cache[key] = result
+        return result
+
+    def get_rank_at_date(self, date: Date | str) -> "PlayerRank|_Literal['Deceased']":
+        if isinstance(date, str):
+            date = parse_date(date)
 
-    def get_rank_at_date(self, date: str) -> "PlayerRank|_Literal['Deceased']":
         if self.active == "Deceased":
             last_rank = self.career_rank_history[-1]
             if date > last_rank.date:
@@ -51,10 +137,6 @@ class Player(_PlayerData):
         else:
             _assert_never(self.active)
 
-        # Fix '2024-01-21' -> '2024-01-21T00:00:00'
-        if "T" not in date:
-            date += "T00:00:00"
-
         rank = self._date_to_rank.get(date)
 
         if rank is not None:
@@ -62,23 +144,84 @@ class Player(_PlayerData):
 
         # We do not have an exact entry for a given date.
         # This means that we have to take the rank from the previous week.
+        index = _bisect_left(self._rank_dates, date)
+
+        if index != 0:
+            rank = self.career_rank_history[index - 1]
+            self._date_to_rank[date] = rank
+            return rank
+
+        date_str = format_date_short(date)
+        assert False, f"{self.name_first} {self.name_last}: No ranking for {date_str}."
+
+
+# MARK: Registry
+
+
+class PlayerRegistry(_Registry[str, Player]):
+    """
+    Every loaded player, by id.
+
+    Rankings for different dates are just lists of the shared players,
+    so the activity and rank history of a player are parsed only once.
+    """
+
+    def get_players(
+        self,
+        player_ids: list[str],
+        stats_seasons: list[int],
+    ) -> list[Player]:
+        "Load the players that are not in the registry yet (and their missing seasons)."
+        unique_ids = list(dict.fromkeys(player_ids))
+        new_ids = [id for id in unique_ids if id not in self._key_to_value]
+
+        if new_ids:
+            for p in _load_players(new_ids, stats_seasons):
+                self._key_to_value[p.id] = p
 
-        for rank in reversed(self.career_rank_history):
-            if rank.date < date:
-                self._date_to_rank[date] = rank
-                return rank
+        # Players loaded before, but for the other seasons.
+        for season in stats_seasons:
+            ids = [
+                id
+                for id in unique_ids
+                if season not in self._key_to_value[id].season_to_stats
+            ]
 
-        assert False, f"{self.name_first} {self.name_last}: No ranking for {date}."
+            if ids:
+                from atp.player_stats import get_players_stats
 
+                id_to_stats = get_players_stats(ids, season)
 
-def get_players(player_ids: list[str]) -> list[Player]:
+                for id in ids:
+                    player = self._key_to_value[id]
+                    player.season_to_stats[season] = id_to_stats[id]
+
+        return [self._key_to_value[id] for id in player_ids]
+
+
+_PLAYERS = PlayerRegistry()
+
+
+def get_player_registry() -> PlayerRegistry:
+    return _PLAYERS
+
+
+def get_players(player_ids: list[str], stats_seasons: list[int]) -> list[Player]:
+    """
+    Players from the shared registry, loaded if needed.
+    'stats_seasons' are the years available in 'Player.get_stats'.
+    """
+    return _PLAYERS.get_players(player_ids, stats_seasons)
+
+
+def _load_players(player_ids: list[str], stats_seasons: list[int]) -> list[Player]:
     from atp.player_data import get_players_data_json
     from atp.player_stats import get_players_stats
     from atp.player_activity import get_players_tournaments
     from atp.player_rank_history import get_players_rank_history
 
     id_to_data = get_players_data_json(player_ids)
-    id_to_stats = get_players_stats(player_ids)
+    season_to_id_to_stats = {s: get_players_stats(player_ids, s) for s in stats_seasons}
     id_to_tournaments = get_players_tournaments(player_ids)
     id_to_rank_history = get_players_rank_history(player_ids)
 
@@ -86,11 +229,66 @@ def get_players(player_ids: list[str]) -> list[Player]:
 
     for id in player_ids:
         data = id_to_data[id]
-        stats_service, stats_return = id_to_stats[id]
+        stats = {s: id_to_stats[id] for s, id_to_stats in season_to_id_to_stats.items()}
         tournaments = id_to_tournaments[id]
         rank_history = id_to_rank_history[id]
 
-        p = Player(id, data, stats_service, stats_return, tournaments, rank_history)
+        p = Player(id, data, stats, tournaments, rank_history)
         result.append(p)
 
     return result
+
+
+# MARK: Rank matrix
+
+
+def get_rank_matrix(players: list[Player]) -> RankMatrix:
+    "Cached for a given player set."
+    key = tuple(p.id for p in players)
+    result = _RANK_MATRIX_CACHE.get(key)
+
+    if result is None:
+        result = RankMatrix({p.id: p.career_rank_history for p in players})
+        _RANK_MATRIX_CACHE[key] = result
+
+    return result
+
+
+_RANK_MATRIX_CACHE = dict[tuple[str, ...], RankMatrix]()
+
+
+def get_ranking_from_history(
+    players: list[Player],
+    date: Date,
+    count: int,
+) -> list[Player] | None:
+    """
+    TOP 'count' for 'date' reconstructed from the rank histories of 'players',
+    without fetching the ranking page. None if 'players' do not contain
+    the whole TOP. Ties at 'count' are cut, as in the ranking page.
+
+    Ranking page in the cache is used instead (the reconstruction only
+    warns about the differences).
+    """
+    matrix = get_rank_matrix(players)
+    id_to_player = {p.id: p for p in players}
+    day = to_date(date).isoformat()
+    rows = get_cached_ranking(count, day)
+
+    if rows is not None:
+        if any(r.id not in id_to_player for r in rows):
+            return None
+
+        errors = matrix.validate(date, rows)
+
+        if errors:
+            message = f"Rank histories differ from the ranking {day}: "
+            _warnings.warn(message + ", ".join(errors))
+
+        return [id_to_player[r.id] for r in rows]
+
+    if matrix.get_missing_ranks(date, count):
+        return None
+
+    entries = matrix.get_ranking(date, count)[:count]
+    return [id_to_player[e.id] for e in entries]
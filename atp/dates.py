@@ -0,0 +1,30 @@
+from functools import cache
+from datetime import date, datetime
+
+Date = int
+"Day number, 0001-01-01 is day 1. Comparison/sorting/arithmetic are just ints."
+
+
+@cache
+def parse_date(s: str) -> Date:
+    """
+    ATP: '2024-01-01T00:00:00' -> Date.
+    Also accepts the short version: '2024-01-01'.
+
+    Cached: all of the matches in a given tournament day share the same object.
+    """
+    return datetime.fromisoformat(s).toordinal()
+
+
+def to_date(d: Date) -> date:
+    return date.fromordinal(d)
+
+
+def format_date(d: Date) -> str:
+    "Date -> '2024-01-01T00:00:00' (ATP format)."
+    return to_date(d).isoformat() + "T00:00:00"
+
+
+def format_date_short(d: Date) -> str:
+    "Date -> '2024-01-01'."
+    return to_date(d).isoformat()
@@ -5,6 +5,8 @@ from browser import get_htmls_browser
 from atp.json_dict import JSONDict
 
 REQUEST_INTERVAL_SECONDS = 5
+REQUEST_CONCURRENCY = 4
+"Pages loaded at the same time, the request rate is still limited by the interval."
 
 
 @dataclass
@@ -47,6 +49,7 @@ def get_json_or_none(
         urls,
         cache_path=cache_path,
         delay=REQUEST_INTERVAL_SECONDS,
+        concurrency=REQUEST_CONCURRENCY,
     )
 
     result = dict[str, JSONDict | None]()
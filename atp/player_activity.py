@@ -2,6 +2,9 @@ from typing import Literal, assert_never
 from dataclasses import dataclass
 from atp.json_dict import JSONDict
 from atp.helpers import create_urls, get_json_or_none
+from atp.tournament import Tournament, get_tournament_catalog
+from atp.registry import Registry
+from atp.dates import Date, parse_date, format_date_short
 
 CACHE_PATH = "atp_cache/atp_player_activity"
 
@@ -10,76 +13,73 @@ CACHE_PATH = "atp_cache/atp_player_activity"
 
 
 class PlayerTournament:
+    "Player results in a single tournament."
+
+    __slots__ = (
+        "tournament",
+        "prize",
+        "prize_currency_symbol",
+        "prize_usd",
+        "player_won_count",
+        "player_lost_count",
+        "matches",
+    )
+
+    Type = Tournament.Type
+    Location = Tournament.Location
 
-    Type = Literal[
-        "Grand slam",
-        "Challenger",
-        "ATP Finals",
-        "Next Gen ATP Finals",
-        "Olympics",
-        "Davis Cup",
-        "ATP Cup",
-        "Laver Cup",
-        "United Cup",
-        "World Team Cup",
-        "1000",
-        "500",
-        "250",
-        "Q",  # Old ATP Masters 1000?
-        "CS",  # Total prize < $800 000
-        "WS",  # Total prize < $500 000
-        "FU",  # Total prize <  $15 000
-        "PZ",  # Miscellaneous Prize Money, Profit Share…
-    ]
+    # Shared between all of the players, see 'TournamentCatalog'.
+
+    @property
+    def id(self) -> str:
+        return self.tournament.id
+
+    @property
+    def name(self) -> str:
+        return self.tournament.name
+
+    @property
+    def name_display(self) -> str:
+        return self.tournament.name_display
+
+    @property
+    def url(self) -> str:
+        return self.tournament.url
+
+    @property
+    def location(self) -> Tournament.Location:
+        return self.tournament.location
+
+    @property
+    def date(self) -> Date:
+        return self.tournament.date
 
     @property
     def date_short(self) -> str:
-        end = self.date.index("T")
-        return self.date[:end]
-
-    @dataclass
-    class Location:
-        city: str | None
-        "New York"
-        country: str | None
-        "United States"
-        # location: str
-        # "NY, U.S.A."
+        return self.tournament.date_short
 
-    def __init__(self, json: "JSONDict") -> None:
-        self.id = json.get_str("EventId")
-        self.name = json.get_str("EventName")
-        "ATP Masters 1000 Monte-Carlo/ATP Masters 1000 Cincinnati"
-        self.name_display = json.get_str("EventDisplayName")
-        "Rolex Monte-Carlo Masters/Cincinnati Open"
-        # self.title = json.get_str_or_none("EventTitle")
-        # self.sc_display_name = json.get_str("ScDisplayName")
-        self.url = json.get_str("TournamentUrl")
-
-        location = json.get_dict("Location")
-        location_city = location.get_str_or_none("EventCity")
-        location_country = location.get_str_or_none("EventCountry")
-        # location_location = location.get_str("EventLocation")
-        self.location = PlayerTournament.Location(location_city, location_country)
-
-        self.date = json.get_str("EventDate")
-        self.date_end = json.get_str("PlayEndDate")
-
-        type = json.get_str("EventType")
-        self.type = _get_tournament_type(self.name, type)
-
-        surface = json.get_str("Surface")
-        surface = surface if surface else None
-        assert surface in ("Grass", "Clay", "Hard", "Carpet", None)
-        self.surface = surface
-
-        in_out_door = json.get_str_or_none("InOutdoor")
-        in_out_door = in_out_door if in_out_door else None
-        assert in_out_door in ("I", "O", None)
-        self.in_out_door = in_out_door
-
-        self.draw_size = json.get_int("SglDrawSize")
-        # self.dbl_draw_size = json.get_int("DblDrawSize")
+    @property
+    def date_end(self) -> Date:
+        return self.tournament.date_end
+
+    @property
+    def type(self) -> Tournament.Type:
+        return self.tournament.type
+
+    @property
+    def surface(self) -> str | None:
+        return self.tournament.surface
+
+    @property
+    def in_out_door(self) -> str | None:
+        return self.tournament.in_out_door
+
+    @property
+    def draw_size(self) -> int:
+        return self.tournament.draw_size
+
+    def __init__(self, tournament: Tournament, json: "JSONDict") -> None:
+        self.tournament = tournament
 
         self.prize = json.get_int("Prize")
         self.prize_currency_symbol = json.get_str_or_none("CurrSymbol")
@@ -110,9 +110,6 @@ class PlayerTournament:
         # self.player_rank = json.get_int("PlayerRank")
         # self.display = json.get_bool("Display")
 
-        # self.tot_fincl_commit = json.get_int("TotFinclCommit")
-        # self.tot_prize_money = json.get_int("TotPrizeMoney")
-
         # self.show_partner_column = json.get_bool("ShowPartnerColumn")
         # self.partner_cms_item_name = json.get_str("PartnerCmsItemName")
         # self.partner_first_name = json.get_NoneType("PartnerFirstName")
@@ -124,22 +121,22 @@ class PlayerTournament:
 # MARK: Match
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Round:
     id: str
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Opponent:
+    "Shared between all of the matches, see 'OpponentRegistry'."
     id: str
-    rank: int
     name_first: str | None
     name_first_initial: str
     name_last: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Set:
     player: int
     opponent: int
@@ -149,48 +146,62 @@ class PlayerMatch_Set:
 PlayerMatch_PrematureEndReason = Literal["Walkover", "Retire", "Default", "Unplayed"]
 
 
-@dataclass
+@dataclass(slots=True)
 class _PlayerMatch_Base:
     id: str
-    date: str
+    date: Date
     round: PlayerMatch_Round
     win_loss: Literal["W", "L"]
     is_title_countable: bool
     is_win_loss_countable: bool
 
+    @property
+    def date_short(self) -> str:
+        return format_date_short(self.date)
+
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Played(_PlayerMatch_Base):
     "Match that finished normally."
     opponent: PlayerMatch_Opponent
+    opponent_rank: int
+    "Opponent rank at the time of the match."
     sets: list[PlayerMatch_Set]
 
 
 class PlayerMatch_Bye(_PlayerMatch_Base):
     "Player did not have to play this round."
+    __slots__ = ()
 
 
 class PlayerMatch_NotPlayed(_PlayerMatch_Base):
     "Before a match: other reason."
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Walkover(_PlayerMatch_Base):
     "Before a match: ill, injured or subjected to penalties of the Code of Conduct."
     opponent: PlayerMatch_Opponent
+    opponent_rank: int
+    "Opponent rank at the time of the match."
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Retire(_PlayerMatch_Base):
     "During a match: ill or injured."
     opponent: PlayerMatch_Opponent
+    opponent_rank: int
+    "Opponent rank at the time of the match."
     sets: list[PlayerMatch_Set]
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerMatch_Default(_PlayerMatch_Base):
     "During a match: Code of Conduct violation."
     opponent: PlayerMatch_Opponent
+    opponent_rank: int
+    "Opponent rank at the time of the match."
     sets: list[PlayerMatch_Set]
 
 
@@ -205,6 +216,45 @@ PlayerMatch = (
 )
 
 
+# MARK: Opponent registry
+
+
+class OpponentRegistry(Registry[str, PlayerMatch_Opponent]):
+    """
+    Every opponent seen in the activity of any player.
+
+    Opponents outside of the loaded players can be resolved by id without
+    downloading their profiles.
+    """
+
+    def intern(
+        self,
+        id: str,
+        name_first: str | None,
+        name_first_initial: str,
+        name_last: str,
+    ) -> PlayerMatch_Opponent:
+        result = self._key_to_value.get(id)
+
+        if result is None:
+            result = PlayerMatch_Opponent(
+                id,
+                name_first,
+                name_first_initial,
+                name_last,
+            )
+            self._key_to_value[id] = result
+
+        return result
+
+
+_OPPONENTS = OpponentRegistry()
+
+
+def get_opponent_registry() -> OpponentRegistry:
+    return _OPPONENTS
+
+
 # MARK: Get
 
 
@@ -222,6 +272,7 @@ def get_players_tournaments(
     )
 
     url_to_stats = get_json_or_none(urls, CACHE_PATH)
+    catalog = get_tournament_catalog()
     result = dict[str, list[PlayerTournament]]()
 
     for p in player_id_urls:
@@ -244,7 +295,8 @@ def get_players_tournaments(
             for t in tournaments_json_list:
                 assert isinstance(t, dict)
                 t_dict = JSONDict(t)
-                tournament = PlayerTournament(t_dict)
+                shared = catalog.intern(t_dict)
+                tournament = PlayerTournament(shared, t_dict)
                 tournaments.append(tournament)
 
         tournaments.sort(key=lambda t: (t.date, t.date_end, t.name))
@@ -252,68 +304,6 @@ def get_players_tournaments(
     return result
 
 
-# MARK: Get type
-
-
-def _get_tournament_type(name: str, type: str) -> PlayerTournament.Type:
-    if type == "GS":
-        assert name in (
-            "US Open",
-            "Wimbledon",
-            "Roland Garros",
-            "Australian Open",
-        )
-        return "Grand slam"
-
-    if type == "CH":
-        return "Challenger"
-
-    if type == "WC":
-        assert "ATP Finals" in name or name == "Tennis Masters Cup"
-        return "ATP Finals"
-
-    if type == "XXI":
-        assert "Next Gen ATP Finals" in name
-        return "Next Gen ATP Finals"
-
-    if type == "OL":
-        assert "Olympics" in name
-        return "Olympics"
-
-    if type == "DC":
-        # 'name' can me multiple things
-        return "Davis Cup"
-
-    if type == "ATPC":
-        assert name == "ATP Cup"
-        return "ATP Cup"
-
-    if type == "LVR":
-        assert name == "Laver Cup"
-        return "Laver Cup"
-
-    if type == "UC":
-        assert name == "United Cup"
-        return "United Cup"
-
-    if type == "WT":
-        assert name == "World Team Cup"
-        return "World Team Cup"
-
-    assert type in (
-        "1000",
-        "500",
-        "250",
-        "Q",
-        "CS",
-        "WS",
-        "FU",
-        "PZ",
-    ), f"Unknown event type: {type}"
-
-    return type
-
-
 # MARK: Get match
 
 
@@ -321,7 +311,7 @@ class _PlayerMatchParse:
 
     def __init__(self, json: "JSONDict") -> None:
         self.id = json.get_str("MatchId")
-        self.date = json.get_str("MatchDate")
+        self.date = parse_date(json.get_str("MatchDate"))
 
         # self.has_stats = json.get_bool("HasStats")
         # self.stats_url = json.get_str("MatchStatsUrl")
@@ -333,26 +323,25 @@ class _PlayerMatchParse:
         round = json.get_dict("Round")
         round_short = round.get_str("ShortName")
         round_long = round.get_str("LongName")
-        self.round = PlayerMatch_Round(round_short, round_long)
+        self.round = _get_round(round_short, round_long)
 
         self.is_bye = json.get_bool("IsBye")
         self.is_title_countable = json.get_bool("IsTitleCountable")
         self.is_win_loss_countable = json.get_bool("IsWinLossCountable")
 
         opponent_id = json.get_str("OpponentId").lower()
-        opponent_rank = json.get_int("OpponentRank")
         opponent_name_first = json.get_str_or_none("OpponentFirstName")
         opponent_name_first_initial = json.get_str("OpponentFirstInitial")
         opponent_name_last = json.get_str("OpponentLastName")
         # self.opponent_cms_item_name = json.get_str("OpponentCmsItemName")
         # self.opponent_natl_id = json.get_str("OpponentNatlId")
-        self.opponent = PlayerMatch_Opponent(
+        self.opponent = _OPPONENTS.intern(
             opponent_id,
-            opponent_rank,
             opponent_name_first,
             opponent_name_first_initial,
             opponent_name_last,
         )
+        self.opponent_rank = json.get_int("OpponentRank")
 
         self.sets = list[PlayerMatch_Set]()
 
@@ -404,6 +393,21 @@ class _PlayerMatchParse:
         assert json.get_str_or_none("OpponentPartnerCmsItemName") in ("-", None)
 
 
+_ROUNDS = dict[tuple[str, str], PlayerMatch_Round]()
+
+
+def _get_round(id: str, name: str) -> PlayerMatch_Round:
+    "There are only a few rounds, no need to create them for every match."
+    key = (id, name)
+    result = _ROUNDS.get(key)
+
+    if result is None:
+        result = PlayerMatch_Round(id, name)
+        _ROUNDS[key] = result
+
+    return result
+
+
 def _get_match(json: JSONDict) -> PlayerMatch:
     p = _PlayerMatchParse(json)
 
@@ -437,6 +441,7 @@ def _get_match(json: JSONDict) -> PlayerMatch:
             is_title_countable=p.is_title_countable,
             is_win_loss_countable=p.is_win_loss_countable,
             opponent=p.opponent,
+            opponent_rank=p.opponent_rank,
         )
 
     if p.premature_end_reason == "Retire":
@@ -448,6 +453,7 @@ def _get_match(json: JSONDict) -> PlayerMatch:
             is_title_countable=p.is_title_countable,
             is_win_loss_countable=p.is_win_loss_countable,
             opponent=p.opponent,
+            opponent_rank=p.opponent_rank,
             sets=p.sets,
         )
 
@@ -460,6 +466,7 @@ def _get_match(json: JSONDict) -> PlayerMatch:
             is_title_countable=p.is_title_countable,
             is_win_loss_countable=p.is_win_loss_countable,
             opponent=p.opponent,
+            opponent_rank=p.opponent_rank,
             sets=p.sets,
         )
 
@@ -472,6 +479,7 @@ def _get_match(json: JSONDict) -> PlayerMatch:
             is_title_countable=p.is_title_countable,
             is_win_loss_countable=p.is_win_loss_countable,
             opponent=p.opponent,
+            opponent_rank=p.opponent_rank,
             sets=p.sets,
         )
 
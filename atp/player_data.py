@@ -2,6 +2,7 @@ from typing import Literal
 from atp.json_dict import JSONDict
 from atp.helpers import create_urls, get_json
 from atp.countries import get_country_by_ioc_code
+from atp.dates import parse_date, format_date_short
 
 CACHE_PATH = "atp_cache/atp_player_data"
 
@@ -24,6 +25,10 @@ class PlayerData:
 
         return None
 
+    @property
+    def birth_date_short(self) -> str:
+        return format_date_short(self.birth_date)
+
     def __init__(self, id: str, json: JSONDict) -> None:
         self.id = id.lower()
 
@@ -33,7 +38,7 @@ class PlayerData:
         # self.name_pronunciation = json.get_str_or_none("Pronunciation")
 
         self.age = json.get_int_or_none("Age")
-        self.birth_date = json.get_str("BirthDate")
+        self.birth_date = parse_date(json.get_str("BirthDate"))
 
         nationality_id = json.get_str("NatlId")
         self.nationality = get_country_by_ioc_code(nationality_id)
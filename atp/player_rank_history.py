@@ -1,10 +1,19 @@
 from atp.json_dict import JSONDict
 from atp.helpers import create_urls, get_json
+from atp.dates import parse_date, format_date_short
 
 CACHE_PATH = "atp_cache/atp_player_rank_history"
+_URL_TEMPLATE = "https://www.atptour.com/en/-/www/rank/history/{id}?v=1"
 
 
 class PlayerRank:
+
+    __slots__ = ("date", "rank", "points", "is_tie")
+
+    @property
+    def date_short(self) -> str:
+        return format_date_short(self.date)
+
     def __init__(self, json: JSONDict) -> None:
         # There are entries for 'race' and 'roll':
         # - roll is the correct one.
@@ -20,7 +29,7 @@ class PlayerRank:
         # 1    | Djokovic | 37  | 9,960  | +100 |     18 |    2,000 | -
         # 2    | Sinner   | 22  | 8,770  | -    |     19 |       45 | -
 
-        self.date = json.get_str("RankDate")
+        self.date = parse_date(json.get_str("RankDate"))
 
         self.rank = json.get_int("SglRollRank")
         self.points = json.get_int("SglRollPoints")
@@ -40,10 +49,7 @@ def get_players_rank_history(player_ids: list[str]) -> dict[str, list[PlayerRank
     https://www.atptour.com/en/-/www/rank/history/s0ag?v=1
     """
 
-    player_id_urls, urls = create_urls(
-        player_ids,
-        "https://www.atptour.com/en/-/www/rank/history/{id}?v=1",
-    )
+    player_id_urls, urls = create_urls(player_ids, _URL_TEMPLATE)
 
     url_to_stats = get_json(urls, CACHE_PATH)
     result = dict[str, list[PlayerRank]]()
@@ -63,3 +69,17 @@ def get_players_rank_history(player_ids: list[str]) -> dict[str, list[PlayerRank
         history.sort(key=lambda r: r.date)
 
     return result
+
+
+def get_cached_rank_history_ids() -> list[str]:
+    "Players with the rank history in the cache (loaded before, by any run)."
+    from cache import Cache, escape_key
+
+    prefix, suffix = (escape_key(s) for s in _URL_TEMPLATE.split("{id}"))
+    keys = Cache(CACHE_PATH).get_keys()
+
+    return [
+        k[len(prefix) : len(k) - len(suffix)]
+        for k in keys
+        if k.startswith(prefix) and k.endswith(suffix)
+    ]
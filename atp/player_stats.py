@@ -1,5 +1,6 @@
+import numpy as np
 from atp.json_dict import JSONDict
-from atp.helpers import create_urls, get_json
+from atp.helpers import get_json, get_json_or_none
 
 CACHE_PATH = "atp_cache/atp_player_stats"
 
@@ -46,24 +47,24 @@ class PlayerStats_Return:
         self.total_points_won_percentage = json.get_int("TotalPointsWonPercentage")
 
 
+# MARK: Season
+
+
 def get_players_stats(
     player_ids: list[str],
+    season: int,
 ) -> dict[str, tuple[PlayerStats_Service, PlayerStats_Return]]:
     """
     Stats - aces/breaks/returns/conversions
     https://www.atptour.com/en/-/www/stats/s0ag/2024/all?v=1
     """
 
-    player_id_urls, urls = create_urls(
-        player_ids,
-        "https://www.atptour.com/en/-/www/stats/{id}/2024/all?v=1",
-    )
-
-    url_to_stats = get_json(urls, CACHE_PATH)
+    id_to_url = {id: _get_url(id, season) for id in player_ids}
+    url_to_stats = get_json(id_to_url.values(), CACHE_PATH)
     result = dict[str, tuple[PlayerStats_Service, PlayerStats_Return]]()
 
-    for p in player_id_urls:
-        json = url_to_stats[p.url]
+    for id, url in id_to_url.items():
+        json = url_to_stats[url]
         inner = json.get_dict("Stats")
 
         service_json = inner.get_dict("ServiceRecordStats")
@@ -71,6 +72,146 @@ def get_players_stats(
 
         service = PlayerStats_Service(service_json)
         return_ = PlayerStats_Return(return_json)
-        result[p.id] = (service, return_)
+        result[id] = (service, return_)
 
     return result
+
+
+def _get_url(player_id: str, season: int) -> str:
+    return f"https://www.atptour.com/en/-/www/stats/{player_id}/{season}/all?v=1"
+
+
+# MARK: Matrix
+
+_SERVICE = "ServiceRecordStats"
+_RETURN = "ReturnRecordStats"
+
+_METRICS = (
+    # Name, JSON dict, JSON key
+    ("service_aces", _SERVICE, "Aces"),
+    ("service_double_faults", _SERVICE, "DoubleFaults"),
+    ("service_games_played", _SERVICE, "ServiceGamesPlayed"),
+    ("service_games_won_percentage", _SERVICE, "ServiceGamesWonPercentage"),
+    ("service_first_serve_percentage", _SERVICE, "FirstServePercentage"),
+    (
+        "service_first_serve_points_won_percentage",
+        _SERVICE,
+        "FirstServePointsWonPercentage",
+    ),
+    (
+        "service_second_serve_points_won_percentage",
+        _SERVICE,
+        "SecondServePointsWonPercentage",
+    ),
+    ("service_break_points_faced", _SERVICE, "BreakPointsFaced"),
+    ("service_break_points_saved_percentage", _SERVICE, "BreakPointsSavedPercentage"),
+    ("service_points_won_percentage", _SERVICE, "ServicePointsWonPercentage"),
+    (
+        "return_first_serve_points_won_percentage",
+        _RETURN,
+        "FirstServeReturnPointsWonPercentage",
+    ),
+    (
+        "return_second_serve_points_won_percentage",
+        _RETURN,
+        "SecondServeReturnPointsWonPercentage",
+    ),
+    ("return_break_points_opportunities", _RETURN, "BreakPointsOpportunities"),
+    (
+        "return_break_points_converted_percentage",
+        _RETURN,
+        "BreakPointsConvertedPercentage",
+    ),
+    ("return_games_played", _RETURN, "ReturnGamesPlayed"),
+    ("return_games_won_percentage", _RETURN, "ReturnGamesWonPercentage"),
+    ("return_points_won_percentage", _RETURN, "ReturnPointsWonPercentage"),
+    ("total_points_won_percentage", _RETURN, "TotalPointsWonPercentage"),
+)
+
+
+class PlayerStatsMatrix:
+    """
+    Stats of many players in many seasons: values[player, season, metric].
+    NaN if the player does not have the stats for a given season.
+    """
+
+    METRICS = tuple(name for name, _, _ in _METRICS)
+
+    def __init__(
+        self,
+        player_ids: list[str],
+        seasons: list[int],
+        values: np.ndarray,
+    ) -> None:
+        assert values.shape == (len(player_ids), len(seasons), len(self.METRICS))
+        self.player_ids = player_ids
+        self.seasons = seasons
+        self.values = values
+        self._season_to_index = {s: i for i, s in enumerate(seasons)}
+        self._metric_to_index = {m: i for i, m in enumerate(self.METRICS)}
+
+    def get(self, metric: str, season: int | None = None) -> np.ndarray:
+        "[player, season] or [player] if the 'season' is given."
+        m = self._metric_to_index[metric]
+
+        if season is None:
+            return self.values[:, :, m]
+
+        return self.values[:, self._season_to_index[season], m]
+
+    def get_year_over_year(self, metric: str) -> np.ndarray:
+        """
+        Change from the previous season in 'seasons' (not the previous year
+        if there is a gap): [player, season - 1], shape (players, seasons - 1).
+        """
+        return np.diff(self.get(metric), axis=1)
+
+    def get_leaderboard(
+        self,
+        metric: str,
+        season: int,
+        count: int,
+    ) -> list[tuple[str, float]]:
+        """
+        Players with the 'count' highest values: (player_id, value).
+        Ties as in the awards, see 'top_k_with_ties'. NaN are skipped.
+        """
+        # 'helpers' imports 'atp'.
+        from helpers import top_k_with_ties
+
+        values = self.get(metric, season)
+        (present,) = np.nonzero(~np.isnan(values))
+        indices = present[top_k_with_ties(values[present], count, is_max=True)]
+
+        return [(self.player_ids[i], float(values[i])) for i in indices.tolist()]
+
+
+def get_players_stats_matrix(
+    player_ids: list[str],
+    seasons: list[int],
+) -> PlayerStatsMatrix:
+    """
+    All of the (player, season) pages are fetched at once.
+    Uses the same cache as 'get_players_stats'.
+    """
+    urls = [_get_url(id, s) for id in player_ids for s in seasons]
+    url_to_stats = get_json_or_none(urls, CACHE_PATH)
+
+    shape = (len(player_ids), len(seasons), len(_METRICS))
+    values = np.full(shape, np.nan, dtype=np.float64)
+
+    for p, id in enumerate(player_ids):
+        for s, season in enumerate(seasons):
+            json = url_to_stats[_get_url(id, season)]
+            inner = json.get_dict_or_none("Stats") if json is not None else None
+
+            # Season without any matches.
+            if inner is None:
+                continue
+
+            for m, (_, dict_key, key) in enumerate(_METRICS):
+                section = inner.get_dict(dict_key)
+                value = section.get_int_or_none(key)
+                values[p, s, m] = np.nan if value is None else value
+
+    return PlayerStatsMatrix(player_ids, seasons, values)
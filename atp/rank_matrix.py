@@ -0,0 +1,127 @@
+import numpy as np
+from bisect import bisect_right
+from dataclasses import dataclass
+from atp.dates import Date, format_date_short
+from atp.ranking import PlayerRow
+from atp.player_rank_history import PlayerRank
+
+
+class RankMatrix:
+    """
+    Weekly rank of every player from a known set: ranks[player_index, week_index].
+    0 means that the player is not ranked (or not known) in a given week.
+
+    Weeks are all of the dates from the rank histories. A player without
+    an entry in a given week keeps the previous rank for 'max_age_days'
+    (histories are downloaded at different times, some weeks are missing).
+    """
+
+    @dataclass(slots=True)
+    class Entry:
+        id: str
+        rank: int
+        points: int
+
+    def __init__(
+        self,
+        id_to_history: dict[str, list[PlayerRank]],
+        max_age_days: int = 28,
+    ) -> None:
+        self.ids = list(id_to_history.keys())
+        self._id_to_index = {id: i for i, id in enumerate(self.ids)}
+
+        all_dates = [r.date for h in id_to_history.values() for r in h]
+        self.dates = np.unique(np.array(all_dates, dtype=np.int64))
+        self._dates_list: list[Date] = self.dates.tolist()
+
+        shape = (len(self.ids), len(self.dates))
+        self.ranks = np.zeros(shape, dtype=np.int32)
+        self.points = np.zeros(shape, dtype=np.int32)
+
+        for index, history in enumerate(id_to_history.values()):
+            if not history:
+                continue
+
+            # 'history' is sorted by date, see 'get_players_rank_history'.
+            dates = np.array([r.date for r in history], dtype=np.int64)
+            ranks = np.array([r.rank for r in history], dtype=np.int32)
+            points = np.array([r.points for r in history], dtype=np.int32)
+
+            # Last entry at or before every week.
+            entry = np.searchsorted(dates, self.dates, side="right") - 1
+            entry_clipped = np.maximum(entry, 0)
+            age = self.dates - dates[entry_clipped]
+            is_valid = (entry >= 0) & (age <= max_age_days)
+
+            self.ranks[index] = np.where(is_valid, ranks[entry_clipped], 0)
+            self.points[index] = np.where(is_valid, points[entry_clipped], 0)
+
+    def get_week_index(self, date: Date) -> int:
+        "Week at or before 'date' (rankings are published on Mondays)."
+        index = bisect_right(self._dates_list, date) - 1
+        assert index >= 0, f"No ranking for {format_date_short(date)}."
+        return index
+
+    def get_ranking(self, date: Date, count: int | None = None) -> list[Entry]:
+        """
+        Players ranked in the week of 'date', sorted by rank (then points).
+        Only the known players: use 'get_missing_ranks' to check the result.
+        """
+        week = self.get_week_index(date)
+        ranks = self.ranks[:, week]
+        points = self.points[:, week]
+
+        (indices,) = np.nonzero(ranks)
+        indices = indices[np.lexsort((-points[indices], ranks[indices]))]
+
+        if count is not None:
+            indices = indices[ranks[indices] <= count]
+
+        return [
+            RankMatrix.Entry(self.ids[i], int(ranks[i]), int(points[i]))
+            for i in indices.tolist()
+        ]
+
+    def get_ranks(self, date: Date) -> dict[str, int]:
+        "Id -> rank in the week of 'date', only the ranked players."
+        week = self.get_week_index(date)
+        ranks = self.ranks[:, week]
+        (indices,) = np.nonzero(ranks)
+        return {self.ids[i]: int(ranks[i]) for i in indices.tolist()}
+
+    def get_missing_ranks(self, date: Date, count: int) -> list[int]:
+        """
+        Ranks in [1, count] that do not belong to any of the known players.
+        Empty -> the TOP 'count' for 'date' is complete.
+        """
+        week = self.get_week_index(date)
+        ranks = self.ranks[:, week]
+        ranks = np.sort(ranks[(ranks > 0) & (ranks <= count)])
+
+        # Tied players share the rank: 2 players at 5 -> 5 and 6 are taken.
+        position = np.arange(len(ranks))
+        tie_offset = position - np.searchsorted(ranks, ranks, side="left")
+        is_taken = np.zeros(count + 1, dtype=np.bool_)
+        is_taken[np.minimum(ranks + tie_offset, count)] = True
+        is_taken[0] = True
+
+        return np.nonzero(~is_taken)[0].tolist()
+
+    def validate(self, date: Date, rows: list[PlayerRow]) -> list[str]:
+        "Differences between the reconstructed ranking and the ATP ranking page."
+        week = self.get_week_index(date)
+        result = list[str]()
+
+        for r in rows:
+            index = self._id_to_index.get(r.id)
+
+            if index is None:
+                result.append(f"{r.name} ({r.rank}): not in the player set")
+                continue
+
+            rank = int(self.ranks[index, week])
+
+            if rank != r.rank:
+                result.append(f"{r.name} ({r.rank}): reconstructed as {rank}")
+
+        return result
@@ -1,9 +1,15 @@
-from bs4 import BeautifulSoup, Tag
-from dataclasses import dataclass
-from browser import get_html_browser
-from atp.helpers import REQUEST_INTERVAL_SECONDS
+import json
+from typing import Sequence
+from dataclasses import dataclass, astuple, fields
+from cache import Cache
+from browser import get_htmls_browser
+from atp.helpers import REQUEST_INTERVAL_SECONDS, REQUEST_CONCURRENCY
 
 CACHE_PATH = "atp_cache/atp_ranking"
+ROWS_CACHE_PATH = "atp_cache/atp_ranking_rows"
+"Parsed pages: JSON with the 'PlayerRow' tuples, much smaller than the html."
+ROWS_CACHE_VERSION = 1
+"Bump when the parser changes, the cached rows are parsed again from the html."
 
 
 @dataclass
@@ -12,102 +18,174 @@ class PlayerRow:
     rank: int
     name: str
     url: str
+    points: int
+    points_move: int
+    "Live change of the points, 0 if there is none."
+    tournament_count: int
+    age: int | None
+
+
+RANKING_PAGE_SIZE = 100
+"Players on a single ATP ranking page, see the 'rankRange' combo box."
 
 
 def get_ranking_top_100() -> list[PlayerRow]:
-    url = "https://www.atptour.com/en/rankings/singles"
-    return _get_ranking(url)
+    return get_ranking(100)
 
 
 def get_ranking_top_100_for_date(date: str):
     "Take date from ATP website, for example: 2024-01-01."
-    url = f"https://www.atptour.com/en/rankings/singles?dateWeek={date}"
-    return _get_ranking(url)
-
-
-def _get_ranking(url: str) -> list[PlayerRow]:
-    html = get_html_browser(
-        url,
-        cache_path=CACHE_PATH,
-        delay=REQUEST_INTERVAL_SECONDS,
-    )
-    soup = BeautifulSoup(html, "html.parser")
-
-    # <table class="mega-table desktop-table non-live">
-    table_tag = soup.find("table", class_=f"mega-table")
-    assert isinstance(table_tag, Tag)
-
-    # <tr class="">
-    #     <td class="rank bold heavy tiny-cell" colspan="1">1</td>
-    #     <td class="player bold heavy large-cell" colspan="7">
-    #         <ul class="player-stats">
-    #             <li class="rank">
-    #             </li>
-    #             <li class="avatar">
-    #                 <img class="headShot " src="/-/media/alias/player-headshot/s0ag" alt="headshot-1" title="Headshot">
-    #                 <svg class="atp-flag atp-flag--tiny flag ">
-    #                     <use href="/assets/atptour/assets/flags.svg#flag-ita"></use>
-    #                 </svg>
-    #             </li>
-    #             <li class="name center">
-    #                 <a href="/en/players/jannik-sinner/s0ag/overview">
-    #                     <span>Jannik Sinner</span>
-    #                 </a>
-    #             </li>
-    #         </ul>
-    #     </td>
-    #     <td class="age small-cell" colspan="2">23</td>
-    #     <td class="points center bold extrabold small-cell" colspan="2">
-    #         <a href="/en/players/jannik-sinner/s0ag/rankings-breakdown?team=singles">
-    #             11,830
-    #         </a>
-    #     </td>
-    #     <td class="small-cell pointsMove center positive" colspan="2">
-    #         +1500 </td>
-    #     <td class="tourns center small-cell" colspan="2">17</td>
-    #     <td class="drop center small-cell" colspan="2">-</td>
-    #     <td class="best center small-cell" colspan="2">-</td>
-    # </tr>
-    result = list[PlayerRow]()
-
-    for row_tag in table_tag.find_all("tr"):
-        assert isinstance(row_tag, Tag)
-
-        name_tag = row_tag.find("li", class_="name")
-        rank_tag = row_tag.find("td", class_="rank")
-
-        # Not a player row
-        if name_tag is None or rank_tag is None:
+    return get_ranking(100, date)
+
+
+def get_ranking(count: int, date: str | None = None) -> list[PlayerRow]:
+    """
+    TOP 'count' players sorted by rank, the current ranking if 'date' is None.
+    Take date from ATP website, for example: 2024-01-01.
+
+    The ATP shows 100 players per page, the pages are fetched concurrently.
+    """
+    return _get_rankings([date], count)[date]
+
+
+def get_rankings(dates: list[str], count: int = 100) -> dict[str, list[PlayerRow]]:
+    """
+    TOP 'count' players for every date, see 'get_ranking'.
+    All of the missing pages are fetched at once (concurrently, with the rate limit).
+    """
+    date_to_rows = _get_rankings(dates, count)
+    return {d: date_to_rows[d] for d in dates}
+
+
+def get_cached_ranking(count: int, date: str | None = None) -> list[PlayerRow] | None:
+    "Same as 'get_ranking', but without fetching: None if any page is not in the cache."
+    return _get_rankings([date], count, only_cached=True).get(date)
+
+
+def _get_rankings(
+    dates: Sequence[str | None],
+    count: int,
+    only_cached: bool = False,
+) -> dict[str | None, list[PlayerRow]]:
+    assert count > 0
+    date_to_urls = {d: _get_ranking_urls(count, d) for d in dates}
+    all_urls = [u for urls in date_to_urls.values() for u in urls]
+    url_to_rows = _get_rows(all_urls, only_cached)
+    result = dict[str | None, list[PlayerRow]]()
+
+    for date, urls in date_to_urls.items():
+        if any(u not in url_to_rows for u in urls):
+            assert only_cached
+            continue
+
+        rows = list[PlayerRow]()
+        ids = set[str]()
+
+        for url in urls:
+            for r in url_to_rows[url]:
+                # Tied players at the page boundary may be on both pages.
+                if r.id not in ids:
+                    ids.add(r.id)
+                    rows.append(r)
+
+        rows.sort(key=lambda r: r.rank)
+        result[date] = rows[:count]
+
+    return result
+
+
+def _get_rows(urls: list[str], only_cached: bool) -> dict[str, list[PlayerRow]]:
+    """
+    Parsed page for every url: rows cache -> html cache -> ATP website.
+    'only_cached' skips the last step, the urls that are not cached are missing.
+    """
+    rows_cache = Cache(ROWS_CACHE_PATH)
+    result = dict[str, list[PlayerRow]]()
+    not_cached_urls = list[str]()
+
+    for url in urls:
+        cached = rows_cache.get(url)
+        rows = _load_rows(cached) if cached is not None else None
+
+        if rows is not None:
+            result[url] = rows
+        else:
+            not_cached_urls.append(url)
+
+    if not not_cached_urls:
+        return result
+
+    if only_cached:
+        html_cache = Cache(CACHE_PATH)
+        url_to_html = {u: html_cache.get(u) for u in not_cached_urls}
+    else:
+        url_to_html = get_htmls_browser(
+            not_cached_urls,
+            cache_path=CACHE_PATH,
+            delay=REQUEST_INTERVAL_SECONDS,
+            concurrency=REQUEST_CONCURRENCY,
+        )
+
+    from atp.ranking_parser import parse_ranking
+
+    for url in not_cached_urls:
+        html = url_to_html[url]
+
+        if html is None:
             continue
 
-        assert isinstance(rank_tag, Tag)
-        assert isinstance(name_tag, Tag)
+        rows = parse_ranking(html)
+        result[url] = rows
+
+        rows_cache.put(url, _dump_rows(rows))
+
+    return result
+
+
+def _get_rows_schema() -> dict:
+    "Different schema -> the cached rows are ignored (parsed again)."
+    return {
+        "version": ROWS_CACHE_VERSION,
+        "fields": [f.name for f in fields(PlayerRow)],
+    }
 
-        link_tag = name_tag.find("a")
-        assert isinstance(link_tag, Tag)
 
-        rank_str = rank_tag.get_text().strip()
-        rank = int(rank_str)
+def _dump_rows(rows: list[PlayerRow]) -> str:
+    data = {**_get_rows_schema(), "rows": [astuple(r) for r in rows]}
+    return json.dumps(data, separators=(",", ":"))
 
-        name = link_tag.get_text().strip()
 
-        href = link_tag.attrs["href"]
-        assert isinstance(href, str)
+def _load_rows(cached: str) -> list[PlayerRow] | None:
+    "None if the rows were cached with a different schema."
+    data = json.loads(cached)
 
-        # https://www.atptour.com/en/players/jannik-sinner/s0ag/overview
-        link = "https://www.atptour.com" + href
-        assert link.startswith("https://www.atptour.com/en/players/")
-        assert link.endswith("/overview")
+    # Old cache: just the list of the rows.
+    if not isinstance(data, dict):
+        return None
 
-        # Extract 'id'
-        overview_start_index = link.rindex("/")
-        assert overview_start_index != -1
-        link_no_overview = link[:overview_start_index]
-        id_start_index = link_no_overview.rindex("/")
-        assert id_start_index != -1
-        id: str = link_no_overview[id_start_index:].lstrip("/").lower()
+    schema = _get_rows_schema()
 
-        p = PlayerRow(id, rank, name, link)
-        result.append(p)
+    if any(data.get(k) != v for k, v in schema.items()):
+        return None
+
+    return [PlayerRow(*r) for r in data["rows"]]
+
+
+def _get_ranking_urls(count: int, date: str | None) -> list[str]:
+    date_query = [] if date is None else [f"dateWeek={date}"]
+
+    # 1st page without the 'rankRange', so that it shares the cache
+    # with the old TOP 100 requests.
+    result = [_get_ranking_url(date_query)]
+
+    for first in range(RANKING_PAGE_SIZE + 1, count + 1, RANKING_PAGE_SIZE):
+        last = first + RANKING_PAGE_SIZE - 1
+        url = _get_ranking_url(date_query + [f"rankRange={first}-{last}"])
+        result.append(url)
 
     return result
+
+
+def _get_ranking_url(query: list[str]) -> str:
+    url = "https://www.atptour.com/en/rankings/singles"
+    return url + "?" + "&".join(query) if query else url
@@ -0,0 +1,159 @@
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from atp.ranking import PlayerRow
+
+# Separate module: 'bs4' is imported only if there is a page to parse,
+# usually all of the pages are in the rows cache.
+
+try:
+    import lxml  # pyright: ignore
+
+    _PARSER = "lxml"
+except ImportError:
+    _PARSER = "html.parser"
+
+# The page has 2 tables: 'mobile-table' (rank, name, points) and
+# 'desktop-table' (all of the columns). Only the latter is parsed,
+# the rest of the page is skipped by the tree builder.
+# Function, because newer BeautifulSoup matches the whole 'class' string.
+_TABLE_STRAINER = SoupStrainer(
+    "table",
+    class_=lambda c: c is not None and "desktop-table" in c.split(),
+)
+
+
+def parse_ranking(html: str) -> list[PlayerRow]:
+    table_html = _get_table_html(html)
+    soup = BeautifulSoup(table_html, _PARSER, parse_only=_TABLE_STRAINER)
+
+    # <table class="mega-table desktop-table non-live">
+    table_tag = soup.find("table", class_="mega-table")
+    assert isinstance(table_tag, Tag)
+    return _parse_table(table_tag)
+
+
+def _get_table_html(html: str) -> str:
+    """
+    Cut the 'desktop-table' out of the page, so that the parser does not have
+    to tokenize the whole page. Whole page if the table can't be found.
+    """
+    index = html.find("desktop-table")
+    start = html.rfind("<table", 0, index) if index != -1 else -1
+    end = html.find("</table>", index) if index != -1 else -1
+
+    if start == -1 or end == -1:
+        return html
+
+    return html[start : end + len("</table>")]
+
+
+def _parse_table(table_tag: Tag) -> list[PlayerRow]:
+    # <tr class="">
+    #     <td class="rank bold heavy tiny-cell" colspan="1">1</td>
+    #     <td class="player bold heavy large-cell" colspan="7">
+    #         <ul class="player-stats">
+    #             <li class="rank">
+    #             </li>
+    #             <li class="avatar">
+    #                 <img class="headShot " src="/-/media/alias/player-headshot/s0ag" alt="headshot-1" title="Headshot">
+    #                 <svg class="atp-flag atp-flag--tiny flag ">
+    #                     <use href="/assets/atptour/assets/flags.svg#flag-ita"></use>
+    #                 </svg>
+    #             </li>
+    #             <li class="name center">
+    #                 <a href="/en/players/jannik-sinner/s0ag/overview">
+    #                     <span>Jannik Sinner</span>
+    #                 </a>
+    #             </li>
+    #         </ul>
+    #     </td>
+    #     <td class="age small-cell" colspan="2">23</td>
+    #     <td class="points center bold extrabold small-cell" colspan="2">
+    #         <a href="/en/players/jannik-sinner/s0ag/rankings-breakdown?team=singles">
+    #             11,830
+    #         </a>
+    #     </td>
+    #     <td class="small-cell pointsMove center positive" colspan="2">
+    #         +1500 </td>
+    #     <td class="tourns center small-cell" colspan="2">17</td>
+    #     <td class="drop center small-cell" colspan="2">-</td>
+    #     <td class="best center small-cell" colspan="2">-</td>
+    # </tr>
+    result = list[PlayerRow]()
+
+    for row_tag in table_tag.find_all("tr"):
+        assert isinstance(row_tag, Tag)
+
+        # Class -> cell: 'rank', 'player', 'age', 'points'…
+        class_to_cell = dict[str, Tag]()
+
+        for cell_tag in row_tag.find_all("td", recursive=False):
+            assert isinstance(cell_tag, Tag)
+            classes = cell_tag.get_attribute_list("class")
+
+            for c in classes:
+                class_to_cell[c] = cell_tag
+
+        rank_tag = class_to_cell.get("rank")
+        player_tag = class_to_cell.get("player")
+
+        # Not a player row
+        if rank_tag is None or player_tag is None:
+            continue
+
+        link_tag = player_tag.find("a")
+        assert isinstance(link_tag, Tag)
+
+        # Tied players: '107T'.
+        rank_str = rank_tag.get_text().strip().rstrip("T")
+        rank = int(rank_str)
+
+        name = link_tag.get_text().strip()
+
+        href = link_tag.attrs["href"]
+        assert isinstance(href, str)
+
+        # https://www.atptour.com/en/players/jannik-sinner/s0ag/overview
+        link = "https://www.atptour.com" + href
+        assert link.startswith("https://www.atptour.com/en/players/")
+        assert link.endswith("/overview")
+
+        # Extract 'id'
+        overview_start_index = link.rindex("/")
+        assert overview_start_index != -1
+        link_no_overview = link[:overview_start_index]
+        id_start_index = link_no_overview.rindex("/")
+        assert id_start_index != -1
+        id: str = link_no_overview[id_start_index:].lstrip("/").lower()
+
+        points = _parse_int(class_to_cell["points"])
+        points_move = _parse_int_or_none(class_to_cell["pointsMove"])
+        tournament_count = _parse_int(class_to_cell["tourns"])
+        age = _parse_int_or_none(class_to_cell["age"])
+
+        p = PlayerRow(
+            id,
+            rank,
+            name,
+            link,
+            points,
+            0 if points_move is None else points_move,
+            tournament_count,
+            age,
+        )
+
+        result.append(p)
+
+    return result
+
+
+def _parse_int(tag: Tag) -> int:
+    "'11,830' -> 11830, '+1500' -> 1500"
+    result = _parse_int_or_none(tag)
+    assert result is not None, tag
+    return result
+
+
+def _parse_int_or_none(tag: Tag) -> int | None:
+    "'-'/'' -> None"
+    s = tag.get_text().strip().replace(",", "")
+    return None if s in ("-", "") else int(s)
@@ -0,0 +1,26 @@
+from typing import Generic, Hashable, Iterator, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Registry(Generic[K, V]):
+    """
+    Exactly 1 shared object per key, for the whole process (module singleton).
+    Subclasses add the objects in their 'intern'/'get_*' methods.
+    """
+
+    def __init__(self) -> None:
+        self._key_to_value = dict[K, V]()
+
+    def __len__(self) -> int:
+        return len(self._key_to_value)
+
+    def __iter__(self) -> Iterator[V]:
+        return iter(self._key_to_value.values())
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._key_to_value
+
+    def get(self, key: K) -> V | None:
+        return self._key_to_value.get(key)
@@ -0,0 +1,206 @@
+from typing import Literal
+from dataclasses import dataclass
+from atp.json_dict import JSONDict
+from atp.registry import Registry
+from atp.dates import Date, parse_date, format_date_short
+
+
+# MARK: Tournament
+
+
+class Tournament:
+    "Single edition of a tournament, shared by all of the players that took part in it."
+
+    __slots__ = (
+        "id",
+        "name",
+        "name_display",
+        "url",
+        "location",
+        "date",
+        "date_end",
+        "type",
+        "surface",
+        "in_out_door",
+        "draw_size",
+    )
+
+    Type = Literal[
+        "Grand slam",
+        "Challenger",
+        "ATP Finals",
+        "Next Gen ATP Finals",
+        "Olympics",
+        "Davis Cup",
+        "ATP Cup",
+        "Laver Cup",
+        "United Cup",
+        "World Team Cup",
+        "1000",
+        "500",
+        "250",
+        "Q",  # Old ATP Masters 1000?
+        "CS",  # Total prize < $800 000
+        "WS",  # Total prize < $500 000
+        "FU",  # Total prize <  $15 000
+        "PZ",  # Miscellaneous Prize Money, Profit Share…
+    ]
+
+    @property
+    def date_short(self) -> str:
+        return format_date_short(self.date)
+
+    @dataclass(slots=True)
+    class Location:
+        city: str | None
+        "New York"
+        country: str | None
+        "United States"
+        # location: str
+        # "NY, U.S.A."
+
+    def __init__(self, json: "JSONDict") -> None:
+        self.id = json.get_str("EventId")
+        self.name = json.get_str("EventName")
+        "ATP Masters 1000 Monte-Carlo/ATP Masters 1000 Cincinnati"
+        self.name_display = json.get_str("EventDisplayName")
+        "Rolex Monte-Carlo Masters/Cincinnati Open"
+        # self.title = json.get_str_or_none("EventTitle")
+        # self.sc_display_name = json.get_str("ScDisplayName")
+        self.url = json.get_str("TournamentUrl")
+
+        location = json.get_dict("Location")
+        location_city = location.get_str_or_none("EventCity")
+        location_country = location.get_str_or_none("EventCountry")
+        # location_location = location.get_str("EventLocation")
+        self.location = Tournament.Location(location_city, location_country)
+
+        self.date = parse_date(json.get_str("EventDate"))
+        self.date_end = parse_date(json.get_str("PlayEndDate"))
+
+        type = json.get_str("EventType")
+        self.type = _get_tournament_type(self.name, type)
+
+        surface = json.get_str("Surface")
+        surface = surface if surface else None
+        assert surface in ("Grass", "Clay", "Hard", "Carpet", None)
+        self.surface = surface
+
+        in_out_door = json.get_str_or_none("InOutdoor")
+        in_out_door = in_out_door if in_out_door else None
+        assert in_out_door in ("I", "O", None)
+        self.in_out_door = in_out_door
+
+        self.draw_size = json.get_int("SglDrawSize")
+        # self.dbl_draw_size = json.get_int("DblDrawSize")
+
+        # self.tot_fincl_commit = json.get_int("TotFinclCommit")
+        # self.tot_prize_money = json.get_int("TotPrizeMoney")
+
+
+# MARK: Catalog
+
+
+class TournamentCatalog(Registry[tuple[str, Date], Tournament]):
+    """
+    Every tournament edition seen in the activity of any player,
+    keyed by (event id, start date).
+
+    Editions are keyed by event id and start date, not by the calendar year:
+    the season starts on the last days of December (Brisbane 2018-12-31 is
+    the 2019 edition) and some events do not have a valid end date.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._id_to_tournaments = dict[str, list[Tournament]]()
+
+    def get_editions(self, id: str) -> list[Tournament]:
+        "All of the editions of a given event: oldest -> newest."
+        editions = self._id_to_tournaments.get(id, [])
+        return sorted(editions, key=lambda t: t.date)
+
+    def intern(self, json: JSONDict) -> Tournament:
+        "Get the shared tournament for the activity entry, create if needed."
+        key = (json.get_str("EventId"), parse_date(json.get_str("EventDate")))
+        result = self._key_to_value.get(key)
+
+        if result is not None:
+            return result
+
+        result = Tournament(json)
+        self._key_to_value[key] = result
+
+        editions = self._id_to_tournaments.setdefault(result.id, [])
+        editions.append(result)
+
+        return result
+
+
+_CATALOG = TournamentCatalog()
+
+
+def get_tournament_catalog() -> TournamentCatalog:
+    return _CATALOG
+
+
+# MARK: Get type
+
+
+def _get_tournament_type(name: str, type: str) -> Tournament.Type:
+    if type == "GS":
+        assert name in (
+            "US Open",
+            "Wimbledon",
+            "Roland Garros",
+            "Australian Open",
+        )
+        return "Grand slam"
+
+    if type == "CH":
+        return "Challenger"
+
+    if type == "WC":
+        assert "ATP Finals" in name or name == "Tennis Masters Cup"
+        return "ATP Finals"
+
+    if type == "XXI":
+        assert "Next Gen ATP Finals" in name
+        return "Next Gen ATP Finals"
+
+    if type == "OL":
+        assert "Olympics" in name
+        return "Olympics"
+
+    if type == "DC":
+        # 'name' can me multiple things
+        return "Davis Cup"
+
+    if type == "ATPC":
+        assert name == "ATP Cup"
+        return "ATP Cup"
+
+    if type == "LVR":
+        assert name == "Laver Cup"
+        return "Laver Cup"
+
+    if type == "UC":
+        assert name == "United Cup"
+        return "United Cup"
+
+    if type == "WT":
+        assert name == "World Team Cup"
+        return "World Team Cup"
+
+    assert type in (
+        "1000",
+        "500",
+        "250",
+        "Q",
+        "CS",
+        "WS",
+        "FU",
+        "PZ",
+    ), f"Unknown event type: {type}"
+
+    return type
@@ -0,0 +1,152 @@
+"""
+Png files vs svg inlined in the html.
+
+Run from the repository root:
+python3 -m benchmarks.chart_svg
+python3 -m benchmarks.chart_svg --render  # + page screenshot (Playwright)
+
+'draw' builds the figure, 'encode' is 'write_img' (png file) or 'get_svg'.
+'render' is the screenshot of a page with all of the charts, for png
+the browser has to read and decode the files.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from typing import Callable
+from chart import Chart
+
+_WIDTH = 1180
+_REPEAT_COUNT = 5
+
+
+def main():
+    is_render = "--render" in sys.argv
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        png_draw, png_encode, png_html = _measure_png(dir_path)
+        svg_draw, svg_encode, svg_html = _measure_svg()
+        print(f"{len(_CHARTS)} charts, {_REPEAT_COUNT} repeats")
+        _print("png", png_draw, png_encode)
+        _print("svg", svg_draw, svg_encode)
+        print(f"html: png {len(png_html) // 1024} KiB, svg {len(svg_html) // 1024} KiB")
+
+        if is_render:
+            png_render = _measure_render(dir_path, "png", png_html)
+            svg_render = _measure_render(dir_path, "svg", svg_html)
+            print(f"render: png {png_render:.2f}s, svg {svg_render:.2f}s")
+
+
+def _print(name: str, draw: float, encode: float):
+    print(f"{name}: draw {draw * 1000:>7.1f} ms, encode {encode * 1000:>7.1f} ms")
+
+
+def _measure_png(dir_path: str) -> tuple[float, float, str]:
+    "Seconds per all of the charts: draw, encode. Html with the img tags."
+    draw = encode = 0.0
+    paths = list[str]()
+
+    for _ in range(_REPEAT_COUNT):
+        paths.clear()
+
+        for i, create in enumerate(_CHARTS):
+            start = time.perf_counter()
+            chart = create()
+            draw += time.perf_counter() - start
+
+            path = os.path.join(dir_path, f"chart_{i}.png")
+            paths.append(path)
+            start = time.perf_counter()
+            chart.write_img(path, width=_WIDTH)
+            encode += time.perf_counter() - start
+
+    html = "".join(f'<img src="{p}">' for p in paths)
+    return draw / _REPEAT_COUNT, encode / _REPEAT_COUNT, html
+
+
+def _measure_svg() -> tuple[float, float, str]:
+    "Seconds per all of the charts: draw, encode. Html with the svg markup."
+    draw = encode = 0.0
+    svgs = list[str]()
+
+    for _ in range(_REPEAT_COUNT):
+        svgs.clear()
+
+        for create in _CHARTS:
+            start = time.perf_counter()
+            chart = create()
+            draw += time.perf_counter() - start
+
+            start = time.perf_counter()
+            svgs.append(chart.get_svg(width=_WIDTH))
+            encode += time.perf_counter() - start
+
+    return draw / _REPEAT_COUNT, encode / _REPEAT_COUNT, "".join(svgs)
+
+
+def _measure_render(dir_path: str, name: str, body: str) -> float:
+    from browser import save_pngs
+
+    html_path = os.path.join(dir_path, f"{name}.html")
+    image_path = os.path.join(dir_path, f"{name}_page.png")
+
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html><html><body>{body}</body></html>")
+
+    url_to_duration = save_pngs({"file:" + html_path: image_path}, width=_WIDTH)
+    return sum(url_to_duration.values())
+
+
+# MARK: Charts
+
+_RNG = np.random.default_rng(0)
+
+
+def _create_bar() -> Chart:
+    result = Chart()
+    result.set_aspect_rato(2, 1)
+    x = np.arange(1, 101)
+    result.add_bar(x, _RNG.integers(0, 100, len(x)))
+    return result
+
+
+def _create_plot() -> Chart:
+    result = Chart()
+    result.set_aspect_rato(2, 1)
+    x = np.arange(52)
+
+    for _ in range(50):
+        result.add_plot(x, np.cumsum(_RNG.normal(size=len(x))))
+
+    return result
+
+
+def _create_scatter() -> Chart:
+    result = Chart()
+    result.set_aspect_rato(1, 1)
+    result.add_scatter(_RNG.normal(size=500), _RNG.normal(size=500))
+    return result
+
+
+def _create_heatmap() -> Chart:
+    result = Chart()
+    result.set_aspect_rato(1, 1)
+    xs = list(range(1, 51))
+    values = _RNG.integers(0, 10, (len(xs), len(xs)))
+    heatmap = result.add_heatmap(xs, xs, values)
+    result.add_color_bar(heatmap)
+    return result
+
+
+_CHARTS: list[Callable[[], Chart]] = [
+    _create_bar,
+    _create_plot,
+    _create_scatter,
+    _create_heatmap,
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import time of every stage, each in a new process, against a time budget.
+
+Run from the repository root:
+python3 -m benchmarks.import_time
+
+Also checks that a stage does not import the heavy modules of the later
+stages (e.g. '--data-only' must not import matplotlib or Playwright).
+Exits with 1 if any stage fails. Budgets are generous (2-3x on a 1 CPU
+machine), they catch a heavy import at the module level, not the noise.
+"""
+
+import sys
+import json
+import subprocess
+from dataclasses import dataclass
+
+_REPEAT_COUNT = 5
+
+
+@dataclass
+class _Stage:
+    name: str
+    code: str
+    "Imports of the stage, timed."
+    budget: float
+    "Seconds, the best of the runs."
+    forbidden_modules: list[str]
+
+
+_DATA_FORBIDDEN = ["asyncio", "bs4", "playwright", "jinja2", "matplotlib", "pandas"]
+
+_STAGES = [
+    _Stage("data", "import atp", 0.25, _DATA_FORBIDDEN),
+    # '__main__.py' without running 'main': startup of 'python3 . --data-only'.
+    _Stage("cli", "import runpy; runpy.run_path('.')", 0.3, _DATA_FORBIDDEN),
+    _Stage("chart", "import chart", 1.0, ["playwright", "bs4", "pandas"]),
+]
+
+
+def main():
+    errors = list[str]()
+
+    for stage in _STAGES:
+        duration, modules = _measure(stage.code)
+        imported = [m for m in stage.forbidden_modules if m in modules]
+        status = "ok"
+
+        if duration > stage.budget:
+            status = "OVER BUDGET"
+            errors.append(f"{stage.name}: {duration:.2f}s > {stage.budget:.2f}s")
+
+        if imported:
+            status = "FORBIDDEN IMPORTS"
+            errors.append(f"{stage.name}: imports {', '.join(imported)}")
+
+        print(
+            f"{stage.name:<6} {duration * 1000:>6.0f} ms "
+            f"(budget {stage.budget * 1000:>5.0f} ms) {status}"
+        )
+
+    if errors:
+        print("Failed: " + "; ".join(errors))
+        sys.exit(1)
+
+
+def _measure(code: str) -> tuple[float, set[str]]:
+    "Seconds (best of the runs) and the top level packages that were imported."
+    durations = list[float]()
+    modules = set[str]()
+
+    for _ in range(_REPEAT_COUNT):
+        script = (
+            "import sys, json, time; s = time.perf_counter(); "
+            f"{code}; d = time.perf_counter() - s; "
+            "print(json.dumps([d, sorted({m.split('.')[0] for m in sys.modules})]))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", script], text=True)
+        duration, names = json.loads(output.splitlines()[-1])
+        durations.append(duration)
+        modules.update(names)
+
+    return min(durations), modules
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Time needed to render the world map with each 'MapData.Backend'.
+
+Run from the repository root:
+python3 -m benchmarks.map_render
+
+'first' renders the base layer as well (no cache), 'next' is the average
+of the following renders. 'import' is the time to import 'chart' with the backend.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import numpy as np
+import chart
+from typing import get_args
+from chart import Map, MapData
+from map_geometry import get_map_geometry
+
+_WIDTH = 1180
+_REPEAT_COUNT = 5
+_BACKEND_TO_IMPORT: dict[MapData.Backend, str] = {
+    "numpy": "chart",
+    "geopandas": "chart, geopandas",
+}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as dir_path:
+        # Base layers are rendered to a temporary cache.
+        chart._MAP_BASE_LAYER_CACHE_PATH = dir_path
+        path = os.path.join(dir_path, "map.png")
+
+        for backend in get_args(MapData.Backend):
+            import_time = _measure_import(_BACKEND_TO_IMPORT[backend])
+            first, next = _measure_render(backend, path)
+            print(
+                f"{backend:<10} import {import_time * 1000:>6.0f} ms, "
+                f"first {first * 1000:>6.0f} ms, next {next * 1000:>6.0f} ms"
+            )
+
+
+def _measure_render(backend: MapData.Backend, path: str) -> tuple[float, float]:
+    "Seconds: first render, average of the next ones."
+    durations = list[float]()
+
+    for _ in range(_REPEAT_COUNT + 1):
+        start = time.perf_counter()
+        _create_map(backend).write_img(path, width=_WIDTH)
+        durations.append(time.perf_counter() - start)
+
+    return durations[0], sum(durations[1:]) / _REPEAT_COUNT
+
+
+def _measure_import(modules: str) -> float:
+    "Seconds, in a new process (modules are cached in this one)."
+    code = f"import time; s = time.perf_counter(); import {modules}; "
+    code += "print(time.perf_counter() - s)"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    return float(output)
+
+
+def _create_map(backend: MapData.Backend) -> Map:
+    "Similar to page 4: some countries with data, labels and the colorbar."
+    geometry = get_map_geometry()
+    data = MapData(geometry, backend)
+    rng = np.random.default_rng(0)
+
+    result = Map()
+    result.set_aspect_rato(1400, 550)
+    result.set_latitude_range(-60, 90)
+
+    for index in rng.choice(len(geometry), 30, replace=False).tolist():
+        value = int(rng.integers(1, 10))
+        data.values[index] = value
+        x, y = geometry.centroids[index].tolist()
+        result.annotate(x, y, str(value))
+
+    result.add_data(data)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory used by the parsed player activity and rank history.
+
+Run from the repository root (all of the data has to be in 'atp_cache'):
+python3 -m benchmarks.memory
+
+There are only ~70 players in the cache, bigger TOP N repeats them: TOP 500
+is the same players parsed ~7 times. Interned objects (tournament catalog,
+opponent registry, match rounds, 'parse_date' cache) are shared by the whole
+process, including the runs after the 1st one. So only the TOP 50 is the
+memory of distinct players, TOP 500 is the cost of the duplicated data.
+"""
+
+import gc
+import time
+import tracemalloc
+from typing import Any
+from atp import get_ranking_top_100_for_date
+from atp.player_activity import get_players_tournaments
+from atp.player_rank_history import get_players_rank_history
+
+_RANKING_DAYS = ("2024-12-30", "2024-01-01")
+_PLAYER_COUNTS = (50, 500)
+
+
+def main():
+    player_ids = _get_cached_player_ids()
+
+    for count in _PLAYER_COUNTS:
+        ids = [player_ids[i % len(player_ids)] for i in range(count)]
+        size, duration = _measure(ids)
+        size_mb = size / 1024 / 1024
+        print(f"TOP {count:>4}: {size_mb:>8.1f} MB {duration:>6.1f} s")
+
+
+def _get_cached_player_ids() -> list[str]:
+    result = list[str]()
+
+    for day in _RANKING_DAYS:
+        rows = get_ranking_top_100_for_date(day)
+        rows.sort(key=lambda r: r.rank)
+
+        for r in rows[:50]:
+            if r.id not in result:
+                result.append(r.id)
+
+    return result
+
+
+def _measure(player_ids: list[str]) -> tuple[int, float]:
+    "Memory retained after parsing the players one by one (interned objects shared)."
+    keep_alive = list[Any]()
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for id in player_ids:
+        keep_alive.append(get_players_tournaments([id]))
+        keep_alive.append(get_players_rank_history([id]))
+
+    duration = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return size, duration
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Time needed to parse the cached ATP ranking pages.
+
+Run from the repository root (all of the data has to be in 'atp_cache'):
+python3 -m benchmarks.ranking_parse
+
+'whole page' builds the tree for the whole page with 'html.parser' (how it
+used to be done), 'table only' is the current parser.
+"""
+
+import os
+import time
+from typing import Callable
+from bs4 import BeautifulSoup, Tag
+from atp.ranking import CACHE_PATH
+from atp.ranking_parser import _PARSER, parse_ranking, _parse_table
+
+_REPEAT_COUNT = 10
+
+
+def main():
+    htmls = list[str]()
+
+    for name in sorted(os.listdir(CACHE_PATH)):
+        with open(os.path.join(CACHE_PATH, name), "r") as f:
+            htmls.append(f.read())
+
+    assert htmls, f"No pages in '{CACHE_PATH}'"
+    print(f"{len(htmls)} pages, parser: {_PARSER}")
+
+    whole_page = _measure(htmls, _parse_whole_page)
+    table_only = _measure(htmls, parse_ranking)
+    print(f"whole page: {whole_page * 1000:>7.1f} ms/page")
+    print(f"table only: {table_only * 1000:>7.1f} ms/page")
+    print(f"speedup:    {whole_page / table_only:>7.1f}x")
+
+
+def _parse_whole_page(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    table_tag = soup.find("table", class_="desktop-table")
+    assert isinstance(table_tag, Tag)
+    return _parse_table(table_tag)
+
+
+def _measure(htmls: list[str], parse: Callable[[str], object]) -> float:
+    "Average time per page in seconds."
+    start = time.perf_counter()
+
+    for _ in range(_REPEAT_COUNT):
+        for html in htmls:
+            parse(html)
+
+    duration = time.perf_counter() - start
+    return duration / (_REPEAT_COUNT * len(htmls))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import time
 from cache import Cache
-from playwright.sync_api import sync_playwright, ViewportSize
 
+# Asyncio and Playwright are imported only when a page has to be loaded.
 # pip install pytest-playwright
 # PLAYWRIGHT_BROWSERS_PATH="/mnt/Storage/Programming/DEPRECIATED/tennis_stats/playwright" playwright install chromium
 
@@ -17,59 +17,167 @@ def get_html_browser(
     return d[url]
 
 
+# MARK: Many
+
+
 def get_htmls_browser(
     urls: list[str],
     *,
     cache_path: str | None = None,
     delay: int | None = None,
+    concurrency: int = 1,
 ) -> dict[str, str]:
+    """
+    Up to 'concurrency' pages are loaded at the same time (tabs in 1 browser).
+    'delay' is the minimum time between the starts of 2 requests, so the
+    request rate stays the same, we just do not wait for the slow pages.
+    """
+    assert concurrency >= 1
     cache = Cache(cache_path) if cache_path else None
     not_cached_urls = list[str]()
     result = dict[str, str]()
 
-    for url in urls:
-        if cache is not None:
-            cached = cache.get(url)
+    # 'dict.fromkeys' -> unique, in order
+    for url in dict.fromkeys(urls):
+        cached = cache.get(url) if cache is not None else None
 
-            if cached is not None:
-                result[url] = cached
-            else:
-                not_cached_urls.append(url)
+        if cached is not None:
+            result[url] = cached
+        else:
+            not_cached_urls.append(url)
 
     if not not_cached_urls:
         return result
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page(viewport=ViewportSize(width=1920, height=1080))
-        url_len = len(not_cached_urls)
+    import asyncio
+
+    fetched = asyncio.run(_fetch_htmls(not_cached_urls, cache, delay, concurrency))
+    result.update(fetched)
+    return result
+
+
+async def _fetch_htmls(
+    urls: list[str],
+    cache: Cache | None,
+    delay: int | None,
+    concurrency: int,
+) -> dict[str, str]:
+    import asyncio
+    from playwright.async_api import async_playwright, Browser, ViewportSize
+
+    result = dict[str, str]()
+    viewport = ViewportSize(width=1920, height=1080)
+    semaphore = asyncio.Semaphore(concurrency)
+    start_lock = asyncio.Lock()
+    next_start_time = 0.0
+    url_len = len(urls)
+
+    async def wait_for_start():
+        # Lock is FIFO, so the requests start in the 'urls' order.
+        nonlocal next_start_time
+
+        async with start_lock:
+            now = asyncio.get_running_loop().time()
+
+            if now < next_start_time:
+                await asyncio.sleep(next_start_time - now)
+                now = next_start_time
 
-        for index, url in enumerate(not_cached_urls):
-            if index != 0 and delay is not None:
-                time.sleep(delay)
+            next_start_time = now + (delay or 0)
 
+    async def fetch(browser: Browser, index: int, url: str):
+        async with semaphore:
+            await wait_for_start()
             print(f"{index+1}/{url_len} {url}")
-            page.goto(url)
-            html = page.content()
-            result[url] = html
+            page = await browser.new_page(viewport=viewport)
 
-            if cache is not None:
-                cache.put(url, html)
+            try:
+                await page.goto(url)
+                html = await page.content()
+            finally:
+                await page.close()
+
+        result[url] = html
+
+        if cache is not None:
+            cache.put(url, html)
 
-        browser.close()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+
+        try:
+            tasks = [fetch(browser, i, url) for i, url in enumerate(urls)]
+            await asyncio.gather(*tasks)
+        finally:
+            await browser.close()
 
     return result
 
 
+# MARK: Image
+
+
 def save_png(url: str, path: str, /, width: int):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport=ViewportSize(width=width, height=720))
-
-        page.goto(url)
-        page.screenshot(
-            path=path,
-            full_page=True,
-            animations="disabled",
-        )
-        browser.close()
+    save_pngs({url: path}, width=width)
+
+
+def save_pngs(
+    url_to_path: dict[str, str],
+    /,
+    width: int,
+    concurrency: int = 4,
+) -> dict[str, float]:
+    """
+    Full page screenshots: 1 browser, every page in its own context,
+    up to 'concurrency' at the same time. Returns url -> seconds.
+    """
+    assert concurrency >= 1
+
+    if not url_to_path:
+        return {}
+
+    import asyncio
+
+    return asyncio.run(_save_pngs(url_to_path, width, concurrency))
+
+
+async def _save_pngs(
+    url_to_path: dict[str, str],
+    width: int,
+    concurrency: int,
+) -> dict[str, float]:
+    import asyncio
+    from playwright.async_api import async_playwright, Browser, ViewportSize
+
+    result = dict[str, float]()
+    semaphore = asyncio.Semaphore(concurrency)
+    viewport = ViewportSize(width=width, height=720)
+
+    async def save(browser: Browser, url: str, path: str):
+        async with semaphore:
+            start = time.perf_counter()
+            context = await browser.new_context(viewport=viewport)
+
+            try:
+                page = await context.new_page()
+                await page.goto(url)
+                await page.screenshot(
+                    path=path,
+                    full_page=True,
+                    animations="disabled",
+                )
+            finally:
+                await context.close()
+
+            result[url] = time.perf_counter() - start
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+
+        try:
+            tasks = [save(browser, url, path) for url, path in url_to_path.items()]
+            await asyncio.gather(*tasks)
+        finally:
+            await browser.close()
+
+    return result
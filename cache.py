@@ -15,6 +15,10 @@ class Cache:
         except IOError:
             return None
 
+    def get_keys(self) -> list[str]:
+        "Escaped keys ('/', ':' and '&' are removed), see 'escape_key'."
+        return sorted(os.listdir(self.dir))
+
     def put(self, key: str, value: str):
         path = self._get_path(key)
 
@@ -22,5 +26,9 @@ class Cache:
             f.write(value)
 
     def _get_path(self, key: str) -> str:
-        key = key.replace("/", "").replace(":", "").replace("&", "")
-        return os.path.join(self.dir, key)
+        return os.path.join(self.dir, escape_key(key))
+
+
+def escape_key(key: str) -> str:
+    "Key as a file name."
+    return key.replace("/", "").replace(":", "").replace("&", "")
@@ -1,24 +1,35 @@
-import pandas as pd
-import geopandas as gpd
+import io
+import os
+import math
+import re
+import time
+import pickle
+import hashlib
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.axes as pltAxes
 import matplotlib.axis as pltAxis
+import matplotlib.cm as pltCm
 import matplotlib.colors as pltColors
 import matplotlib.figure as pltFigure
 import matplotlib.legend as pltLegend
+import matplotlib.path as pltPath
 import matplotlib.ticker as pltTicker
 import matplotlib.collections as pltCollections
 import matplotlib.font_manager as pltFontManager
+from types import CodeType
+from functools import cache, partial
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from typing import (
     Any,
     Literal,
     Iterable,
     Sequence,
-    Hashable,
     Callable,
 )
 from helpers import *
+from map_geometry import MapGeometry
 
 _COLOR_BACKGROUND = "#282a36"
 _COLOR_SELECTION = "#44475a"
@@ -34,6 +45,8 @@ _COLOR_RED = "#ff5555"
 
 _FONT_NAME = "Inconsolata"
 pltFontManager.fontManager.addfont("assets/Inconsolata-VariableFont_wdth,wght.ttf")
+# Same chart -> same svg (ids are hashes salted with this).
+plt.rcParams["svg.hashsalt"] = "chart"
 
 _BACKGROUND_COLOR = _COLOR_BACKGROUND
 _GRID_COLOR = _COLOR_SELECTION
@@ -80,9 +93,15 @@ class Chart:
 
     class _AxisBase:
 
-        def __init__(self, ax: pltAxes.Axes, axis: pltAxis.Axis) -> None:
+        def __init__(
+            self,
+            ax: pltAxes.Axes,
+            axis: pltAxis.Axis,
+            inputs: "_Inputs | None",
+        ) -> None:
             self.ax = ax
             self.axis = axis
+            self._inputs = inputs or _Inputs()
             self.axis.label.set_fontsize(_AXIS_LABEL_FONT_SIZE)
             self.axis.label.set_fontname(_FONT_NAME)
             self.axis.label.set_color(_AXIS_LABEL_COLOR)
@@ -103,10 +122,12 @@ class Chart:
             self.ax.spines["left"].set_color(_AXIS_TICK_COLOR)
 
         def set_major_tick_interval(self, interval: int):
+            self._inputs.add(self.axis.axis_name, "major_tick_interval", interval)
             loc = pltTicker.MultipleLocator(interval)
             self.axis.set_major_locator(loc)
 
         def set_minor_tick_interval(self, value: int):
+            self._inputs.add(self.axis.axis_name, "minor_tick_interval", value)
             loc = pltTicker.MultipleLocator(value)
             self.axis.set_minor_locator(loc)
 
@@ -126,42 +147,49 @@ class Chart:
             self.set_major_tick_interval(interval)
 
         def set_major_formatter_fn(self, fn: Callable[[float, Any], str]):
+            self._inputs.add(self.axis.axis_name, "major_formatter_fn", fn)
             fmt = pltTicker.FuncFormatter(fn)
             self.axis.set_major_formatter(fmt)
 
     class XAxis(_AxisBase):
-        def __init__(self, ax: pltAxes.Axes) -> None:
-            super().__init__(ax, ax.xaxis)
+        def __init__(self, ax: pltAxes.Axes, inputs: "_Inputs | None" = None) -> None:
+            super().__init__(ax, ax.xaxis, inputs)
             self.ax.set_xmargin(0)
             self.set_major_tick_interval(5)
             self.set_minor_tick_interval(1)
 
         def set_label(self, value: str):
+            self._inputs.add("x", "label", value)
             self.ax.set_xlabel(value)
 
         def set_range(self, min: int | float, max: int | float):
+            self._inputs.add("x", "range", min, max)
             self.ax.set_xlim(min, max)
 
     class YAxis(_AxisBase):
-        def __init__(self, ax: pltAxes.Axes) -> None:
-            super().__init__(ax, ax.yaxis)
+        def __init__(self, ax: pltAxes.Axes, inputs: "_Inputs | None" = None) -> None:
+            super().__init__(ax, ax.yaxis, inputs)
             self.ax.set_ymargin(0)
 
         def set_label(self, value: str):
+            self._inputs.add("y", "label", value)
             self.ax.set_ylabel(value)
 
         def set_range(self, min: int | float, max: int | float):
+            self._inputs.add("y", "range", min, max)
             self.ax.set_ylim(min, max)
 
     def __init__(self) -> None:
+        self._inputs = _Inputs()
         self.fig, self.ax = plt.subplots(layout="constrained")
-        self.x_axis = Chart.XAxis(self.ax)
-        self.y_axis = Chart.YAxis(self.ax)
+        self.x_axis = Chart.XAxis(self.ax, self._inputs)
+        self.y_axis = Chart.YAxis(self.ax, self._inputs)
         self._aspect_rato: tuple[int, int] | None = None
         self.ax.set_facecolor(_BACKGROUND_COLOR)  # Inner plot background
         self.fig.set_facecolor(_BACKGROUND_COLOR)  # Outside plot Background
 
     def set_title(self, value: str):
+        self._inputs.add("title", value)
         self.ax.set_title(value)
 
     def set_aspect_rato(self, width: int, height: int):
@@ -169,6 +197,7 @@ class Chart:
         self._aspect_rato = (width, height)
 
     def set_show_grid(self, value: bool):
+        self._inputs.add("show_grid", value)
         self.ax.grid(value)
 
     def add_bar(
@@ -179,6 +208,7 @@ class Chart:
         bottom: Values | None = None,
         color: Sequence[ColorRGBA] | None = None,
     ):
+        self._inputs.add("bar", x, height, bottom, color)
         self.ax.bar(x, height, bottom=bottom, color=color)
 
     def add_plot(
@@ -189,6 +219,7 @@ class Chart:
         color: ColorLiteral | None = None,
         line_width: int | None = None,
     ):
+        self._inputs.add("plot", x, y, label, color, line_width)
         color_2 = _color_literal_to_hex_or_none(color)
         self.ax.plot(x, y, label=label, color=color_2, linewidth=line_width)
 
@@ -206,6 +237,7 @@ class Chart:
         color: ColorLiteral | None = None,
         size: int | None = None,
     ):
+        self._inputs.add("scatter", x, y, marker, color, size)
         color_2 = _color_literal_to_hex_or_none(color)
         self.ax.scatter(x, y, s=size, c=color_2, marker=marker)
 
@@ -218,8 +250,9 @@ class Chart:
         self,
         xs: Xs,
         ys: Xs,
-        values: Sequence[Values],
+        values: Sequence[Values] | np.ndarray,
     ) -> Heatmap:
+        self._inputs.add("heatmap", xs, ys, values)
         cmap = pltColors.LinearSegmentedColormap.from_list(
             "heatmap",
             [
@@ -233,13 +266,7 @@ class Chart:
             ],
         )
 
-        values_unique = set[Chart.Value]()
-
-        for vs in values:
-            for v in vs:
-                values_unique.add(v)
-
-        y_ticks = sorted(values_unique)
+        y_ticks: list[Chart.Value] = np.unique(values).tolist()
         norm = _create_colorbar_norm(cmap, y_ticks)
 
         # 'pcolorfast' gives incorrect XY ticks
@@ -247,6 +274,7 @@ class Chart:
         return Chart.Heatmap(im, y_ticks)
 
     def add_color_bar(self, heatmap: Heatmap, label: str | None = None):
+        self._inputs.add("color_bar", heatmap.y_ticks, label)
         cb = self.fig.colorbar(
             heatmap.im,
             ax=self.ax,
@@ -269,6 +297,7 @@ class Chart:
         color: ColorLiteral | None = None,
         line_width: int = 2,
     ):
+        self._inputs.add("horizontal_line", y, x_start, x_end, label, color, line_width)
         color2 = _color_literal_to_hex_or_none(color)
         self.ax.hlines(
             y,
@@ -288,6 +317,7 @@ class Chart:
         color: ColorLiteral | None = None,
         line_width: int = 2,
     ):
+        self._inputs.add("vertical_line", x, y_start, y_end, color, line_width)
         color2 = _color_literal_to_hex_or_none(color)
         self.ax.vlines(
             x,
@@ -300,6 +330,7 @@ class Chart:
     @dataclass
     class Legend:
         legend: pltLegend.Legend
+        _inputs: "_Inputs"
 
         def set_color(
             self,
@@ -307,6 +338,7 @@ class Chart:
             fill: "Chart.ColorLiteral | None" = None,
             edge: "Chart.ColorLiteral | None" = None,
         ):
+            self._inputs.add("legend_color", index, fill, edge)
             handle = self.legend.legend_handles[index]
             assert handle is not None
 
@@ -317,6 +349,7 @@ class Chart:
             handle.set_edgecolor(edge2)
 
     def add_legend(self, entries: list[str] | None = None) -> Legend:
+        self._inputs.add("legend", entries)
         l: pltLegend.Legend
 
         if entries is None:
@@ -324,7 +357,7 @@ class Chart:
         else:
             l = self.fig.legend(entries)
 
-        return Chart.Legend(l)
+        return Chart.Legend(l, self._inputs)
 
     def create_color_map(
         self,
@@ -360,6 +393,18 @@ class Chart:
     def write_img(self, path: str, *, width: int):
         _write_img(path, self.fig, width, self._aspect_rato)
 
+    def get_svg(self, *, width: int) -> str:
+        "Svg markup that can be inlined in html (instead of 'write_img')."
+        return _get_svg(self.fig, width, self._aspect_rato)
+
+    def close(self):
+        "Release the figure of a chart that will not be written."
+        plt.close(self.fig)
+
+    def get_input_hash(self, width: int) -> str:
+        "Same hash -> same image, see 'write_imgs'."
+        return self._inputs.get_hash(width, self._aspect_rato)
+
 
 # MARK: Map
 
@@ -373,61 +418,43 @@ class Chart:
 
 
 class MapData:
+    "Value of every country from the 'MapGeometry' (0 -> no data)."
 
-    class Row:
-        def __init__(
-            self,
-            data: gpd.GeoDataFrame,
-            index: Hashable,
-            row: pd.Series,
-        ) -> None:
-            self.data = data
-            self.index = index
-            self.row = row
-
-        def __getitem__(self, name: str) -> Any:
-            return self.data.at[self.index, name]
-
-        def __setitem__(self, name: str, value: Any) -> None:
-            self.data.at[self.index, name] = value
-
-    def __init__(self, shp_path: str) -> None:
-        data = gpd.read_file(shp_path)
-        assert isinstance(data, gpd.GeoDataFrame)
-        self.data = data
-
-    def calculate_centroid(self, column_name: str):
-        proj = self.data.to_crs(epsg=3035)
-        assert isinstance(proj, gpd.GeoDataFrame)
-        centroid = proj.geometry.centroid
-        assert isinstance(centroid, gpd.GeoSeries)
-        self.data[column_name] = centroid.to_crs(self.data.crs)
+    Backend = Literal["numpy", "geopandas"]
+    """
+    numpy: paths straight from the geometry arrays,
+    geopandas: 'GeoSeries.plot' (slow import, kept for comparison).
+    """
 
-    def iter_rows(self) -> list[Row]:
-        rows = self.data.iterrows()
-        return [MapData.Row(self.data, i, r) for i, r in rows]
+    def __init__(self, geometry: MapGeometry, backend: Backend = "numpy") -> None:
+        self.geometry = geometry
+        self.backend: MapData.Backend = backend
+        self.values = np.zeros(len(geometry), dtype=np.int64)
 
 
 class Map:
+    """
+    Drawn only in 'write_img', so that it can be pickled with its data
+    and rendered in another process (see 'write_imgs').
+    Base layer (all of the countries) is a cached image in png, paths in svg.
+    """
 
     def __init__(self) -> None:
-        self.fig, self.ax = plt.subplots(layout="constrained")
-        self.ax.axis("off")
-        self.ax.set_xmargin(0)
-        self.ax.set_ymargin(0)
         self._aspect_rato: tuple[int, int] | None = None
-        self.ax.set_facecolor(_BACKGROUND_COLOR)  # Inner plot background
-        self.fig.set_facecolor(_BACKGROUND_COLOR)  # Outside plot Background
+        self._longitude_range: tuple[float, float] | None = None
+        self._latitude_range: tuple[float, float] | None = None
+        self._annotations = list[tuple[float, float, str]]()
+        self._data: MapData | None = None
 
     def set_aspect_rato(self, width: int, height: int):
         "Aspect_rato 2:1 means 200px:100px."
         self._aspect_rato = (width, height)
 
     def set_longitude_range(self, east: float, west: float):
-        self.ax.set_xlim(east, west)
+        self._longitude_range = (east, west)
 
     def set_latitude_range(self, south: float, north: float):
-        self.ax.set_ylim(south, north)
+        self._latitude_range = (south, north)
 
     def annotate(
         self,
@@ -435,54 +462,441 @@ class Map:
         y: float,
         s: str,
     ):
-        self.ax.annotate(
-            s,
-            (x, y),
-            ha="center",
-            va="center",
-            fontfamily=_FONT_NAME,
-            fontsize=_MAP_ANNOTATION_FONT_SIZE,
-            color=_MAP_ANNOTATION_COLOR,
-        )
+        self._annotations.append((x, y, s))
 
-    def add_data(self, data: MapData, column_name: str):
-        cmap = pltColors.LinearSegmentedColormap.from_list(
-            "map",
-            [
-                _COLOR_SELECTION,
-                _COLOR_COMMENT,
-                _COLOR_PURPLE,
-                _COLOR_PINK,
-            ],
-        )
+    def add_data(self, data: MapData):
+        assert self._data is None, "Only 1 data set is supported"
+        self._data = data
+
+    def write_img(self, path: str, *, width: int):
+        fig = self._draw(width, vector=False)
+        _write_img(path, fig, width, self._aspect_rato)
+
+    def get_svg(self, *, width: int) -> str:
+        "Svg markup that can be inlined in html (instead of 'write_img')."
+        fig = self._draw(width, vector=True)
+        return _get_svg(fig, width, self._aspect_rato)
+
+    def get_input_hash(self, width: int) -> str:
+        "Same hash -> same image, see 'write_imgs'."
+        # Everything is in the fields, pickle of the 'MapData' is deterministic.
+        inputs = _Inputs()
+        inputs.add("map", hashlib.sha256(pickle.dumps(self)).hexdigest())
+        return inputs.get_hash(width, self._aspect_rato)
+
+    def _draw(self, width: int, vector: bool) -> pltFigure.Figure:
+        fig, ax = plt.subplots(layout="constrained")
+        ax.axis("off")
+        ax.set_xmargin(0)
+        ax.set_ymargin(0)
+        ax.set_facecolor(_BACKGROUND_COLOR)  # Inner plot background
+        fig.set_facecolor(_BACKGROUND_COLOR)  # Outside plot Background
+
+        if self._longitude_range is not None:
+            ax.set_xlim(*self._longitude_range)
+
+        if self._latitude_range is not None:
+            ax.set_ylim(*self._latitude_range)
+
+        for x, y, s in self._annotations:
+            ax.annotate(
+                s,
+                (x, y),
+                ha="center",
+                va="center",
+                fontfamily=_FONT_NAME,
+                fontsize=_MAP_ANNOTATION_FONT_SIZE,
+                color=_MAP_ANNOTATION_COLOR,
+            )
 
-        values_unique = set()
+        if self._data is not None:
+            # Paths added first are drawn under the countries with data.
+            if vector:
+                _draw_all_countries(ax, self._data)
 
-        for row in data.iter_rows():
-            v = row["VALUE"]
-            values_unique.add(v)
+            _draw_map_data(fig, ax, self._data)
 
-        values = sorted(values_unique)
-        norm = _create_colorbar_norm(cmap, values)
+        # Image of the base layer depends on the final layout.
+        _set_size(fig, width, self._aspect_rato)
 
-        data.data.plot(
-            ax=self.ax,
-            column=column_name,
-            cmap=cmap,
-            norm=norm,
-            facecolor=_COLOR_FOREGROUND,
+        if self._data is not None and not vector:
+            _add_map_base_layer(fig, ax, self._data)
+
+        return fig
+
+
+_MAP_COLORS = [_COLOR_SELECTION, _COLOR_COMMENT, _COLOR_PURPLE, _COLOR_PINK]
+"The 1st one is also the color of the countries in the base layer."
+_MAP_EDGE_WIDTH = 0.2
+_MAP_BASE_LAYER_CACHE_PATH = "map_cache"
+
+
+def _draw_map_data(
+    fig: pltFigure.Figure,
+    ax: pltAxes.Axes,
+    data: MapData,
+):
+    "Only the countries with data, the rest is in the base layer."
+    cmap = pltColors.LinearSegmentedColormap.from_list("map", _MAP_COLORS)
+    values = sorted(set(data.values.tolist()))
+    norm = _create_colorbar_norm(cmap, values)
+
+    geometry = data.geometry
+    _set_map_limits(ax, geometry)
+
+    # Lowest value has the 1st color = the same as in the base layer.
+    has_color = data.values != values[0]
+
+    if has_color.any():
+        colors = cmap(norm(data.values[has_color]))
+        _draw_countries(ax, data, has_color, colors)
+
+    # Same as 'legend=True' in 'GeoDataFrame.plot':
+    # colorbar shrinks with the map (after the aspect is applied).
+    ratio = ax.get_position().height / ax.get_position(original=True).height
+    mappable = pltCm.ScalarMappable(norm=norm, cmap=cmap)
+    colorbar = fig.colorbar(
+        mappable,
+        ax=ax,
+        ticks=values,
+        shrink=ratio,
+        aspect=ratio * 20,
+    )
+
+    # Apply color theme
+    Chart.YAxis(colorbar.ax)
+
+
+def _draw_countries(
+    ax: pltAxes.Axes,
+    data: MapData,
+    mask: np.ndarray,
+    colors: np.ndarray | str,
+):
+    "Countries where 'mask' is True, with edges. Colors: RGBA for each or 1 for all."
+    geometry = data.geometry
+
+    if data.backend == "numpy":
+        paths = [p for p, m in zip(_get_map_paths(geometry), mask.tolist()) if m]
+        collection = pltCollections.PathCollection(
+            paths,
+            facecolors=colors,
+            edgecolors=_COLOR_FOREGROUND,
+            linewidths=_MAP_EDGE_WIDTH,
+        )
+        ax.add_collection(collection, autolim=False)
+    elif data.backend == "geopandas":
+        import geopandas as gpd
+
+        series = gpd.GeoSeries(geometry.to_shapely()[mask], crs=geometry.crs)
+        series.plot(
+            ax=ax,
+            color=colors,
             edgecolor=_COLOR_FOREGROUND,
-            linewidth=0.2,
-            legend=True,
-            legend_kwds={"ticks": values},
+            linewidth=_MAP_EDGE_WIDTH,
+            aspect=None,
         )
+    else:
+        assert_never(data.backend)
 
-        # Apply color theme
-        colorbar = self.fig.axes[1]
-        Chart.YAxis(colorbar)
 
-    def write_img(self, path: str, *, width: int):
-        _write_img(path, self.fig, width, self._aspect_rato)
+def _draw_all_countries(ax: pltAxes.Axes, data: MapData):
+    "Base layer: every country in the 1st color."
+    mask = np.ones(len(data.geometry), dtype=np.bool_)
+    _draw_countries(ax, data, mask, _MAP_COLORS[0])
+
+
+def _get_map_paths(geometry: MapGeometry) -> list[pltPath.Path]:
+    "Cached, paths are the same in every map of the geometry."
+    key = hashlib.sha256(geometry.coords.tobytes()).hexdigest()
+    result = _MAP_PATHS_CACHE.get(key)
+
+    if result is None:
+        result = geometry.get_paths()
+        _MAP_PATHS_CACHE[key] = result
+
+    return result
+
+
+_MAP_PATHS_CACHE = dict[str, list[pltPath.Path]]()
+
+
+def _set_map_limits(ax: pltAxes.Axes, geometry: MapGeometry):
+    "Whole world, not only the drawn countries. Aspect as in 'GeoDataFrame.plot'."
+    x_min, y_min = geometry.coords.min(axis=0).tolist()
+    x_max, y_max = geometry.coords.max(axis=0).tolist()
+
+    if ax.get_autoscalex_on():
+        ax.set_xlim(x_min, x_max)
+
+    if ax.get_autoscaley_on():
+        ax.set_ylim(y_min, y_max)
+
+    # Longitude/latitude: 1 degree of longitude is shorter than 1 of latitude.
+    y = (y_min + y_max) / 2
+    ax.set_aspect(1 / np.cos(y * np.pi / 180))
+
+
+def _add_map_base_layer(
+    fig: pltFigure.Figure,
+    ax: pltAxes.Axes,
+    data: MapData,
+):
+    """
+    All of the countries as an image under the countries with data.
+    Figure has to have its final size, the layout is fixed after this.
+    """
+    fig.draw_without_rendering()
+    fig.set_layout_engine("none")
+
+    # Image covers whole pixels, map axes start somewhere inside the 1st one.
+    bbox = ax.get_window_extent()
+    x0, y0 = math.floor(bbox.x0), math.floor(bbox.y0)
+    x1, y1 = math.ceil(bbox.x1), math.ceil(bbox.y1)
+    layout = _MapBaseLayerLayout(
+        size=(x1 - x0, y1 - y0),
+        axes_bounds=(
+            round(bbox.x0 - x0, 3),
+            round(bbox.y0 - y0, 3),
+            round(bbox.width, 3),
+            round(bbox.height, 3),
+        ),
+        x_range=ax.get_xlim(),
+        y_range=ax.get_ylim(),
+    )
+
+    # Pixel to pixel, no resampling.
+    image = _get_map_base_layer(data, layout)
+    fig.figimage(image, x0, y0, zorder=-1)
+
+
+@dataclass(frozen=True)
+class _MapBaseLayerLayout:
+    size: tuple[int, int]
+    "Pixels."
+    axes_bounds: tuple[float, float, float, float]
+    "Pixels: x, y (from the bottom), width, height."
+    x_range: tuple[float, float]
+    y_range: tuple[float, float]
+
+
+def _get_map_base_layer(data: MapData, layout: _MapBaseLayerLayout) -> np.ndarray:
+    "RGBA, cached in memory and on disk (rendered once for every map layout)."
+    coords_hash = hashlib.sha256(data.geometry.coords.tobytes()).hexdigest()
+    key = repr((coords_hash, data.backend, layout, _get_module_hash()))
+    key = hashlib.sha256(key.encode()).hexdigest()
+    result = _MAP_BASE_LAYER_CACHE.get(key)
+
+    if result is not None:
+        return result
+
+    path = os.path.join(_MAP_BASE_LAYER_CACHE_PATH, key + ".npy")
+
+    if os.path.exists(path):
+        result = np.load(path)
+    else:
+        result = _render_map_base_layer(data, layout)
+        os.makedirs(_MAP_BASE_LAYER_CACHE_PATH, exist_ok=True)
+        np.save(path, result)
+
+    _MAP_BASE_LAYER_CACHE[key] = result
+    return result
+
+
+_MAP_BASE_LAYER_CACHE = dict[str, np.ndarray]()
+
+
+def _render_map_base_layer(data: MapData, layout: _MapBaseLayerLayout) -> np.ndarray:
+    dpi = 100
+    width, height = layout.size
+    fig = plt.figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    fig.set_facecolor(_BACKGROUND_COLOR)
+
+    x, y, w, h = layout.axes_bounds
+    ax = fig.add_axes((x / width, y / height, w / width, h / height))
+    ax.axis("off")
+
+    _draw_all_countries(ax, data)
+    ax.set_xlim(*layout.x_range)
+    ax.set_ylim(*layout.y_range)
+
+    fig.canvas.draw()
+    result = np.asarray(fig.canvas.buffer_rgba()).copy()  # type: ignore
+    plt.close(fig)
+    return result
+
+
+# MARK: Write many
+
+
+@dataclass
+class WriteImgResult:
+    path: str
+    duration: float
+    "Seconds."
+    error: str | None
+
+
+def write_imgs(
+    path_to_chart: "dict[str, Chart | Map]",
+    *,
+    width: int,
+    process_count: int | None = None,
+) -> list[WriteImgResult]:
+    """
+    Write many charts in a process pool. Errors are reported per chart, not
+    raised (a crashed worker included). Charts that can't be pickled are
+    written in this process.
+
+    'Map' is pickled with its inputs and drawn in a worker. 'Chart' is pickled
+    with its figure: the artists are already created in this process, the
+    worker only lays it out and saves it.
+    """
+    process_count = process_count or os.cpu_count() or 1
+    result = list[WriteImgResult]()
+    path_to_job = dict[str, bytes]()
+
+    for path, chart in path_to_chart.items():
+        job: bytes | None = None
+
+        if process_count > 1:
+            try:
+                job = pickle.dumps(chart)
+            except Exception:
+                pass
+
+        if job is None:
+            result.append(_write_img_job(chart, path, width))
+            continue
+
+        path_to_job[path] = job
+
+        # Figure is in the worker now.
+        if isinstance(chart, Chart):
+            chart.close()
+
+    if path_to_job:
+        max_workers = min(process_count, len(path_to_job))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            start = time.perf_counter()
+            path_to_future = {
+                path: pool.submit(_write_pickled_img, job, path, width)
+                for path, job in path_to_job.items()
+            }
+
+            # E.g. 'BrokenProcessPool' when a worker runs out of memory.
+            for path, future in path_to_future.items():
+                try:
+                    result.append(future.result())
+                except Exception as e:
+                    duration = time.perf_counter() - start
+                    result.append(WriteImgResult(path, duration, repr(e)))
+
+    return result
+
+
+def _write_pickled_img(job: bytes, path: str, width: int) -> WriteImgResult:
+    start = time.perf_counter()
+
+    try:
+        chart = pickle.loads(job)
+    except Exception as e:
+        return WriteImgResult(path, time.perf_counter() - start, repr(e))
+
+    return _write_img_job(chart, path, width, start)
+
+
+def _write_img_job(
+    chart: "Chart | Map",
+    path: str,
+    width: int,
+    start: float | None = None,
+) -> WriteImgResult:
+    start = time.perf_counter() if start is None else start
+
+    try:
+        chart.write_img(path, width=width)
+        error = None
+    except Exception as e:
+        error = repr(e)
+
+    return WriteImgResult(path, time.perf_counter() - start, error)
+
+
+# MARK: Input hash
+
+
+class _Inputs:
+    """
+    Everything that was passed to a 'Chart': same inputs -> same image.
+    Styling lives in this module, its source is a part of the hash.
+    """
+
+    def __init__(self) -> None:
+        # Not 'hashlib' object: the chart has to be picklable, see 'write_imgs'.
+        self._entries = list[str]()
+
+    def add(self, *values: Any):
+        self._entries.append(repr(_to_canonical(values)))
+
+    def get_hash(self, width: int, aspect_rato: tuple[int, int] | None) -> str:
+        h = hashlib.sha256()
+
+        for e in self._entries:
+            h.update(e.encode())
+
+        h.update(repr((width, aspect_rato, _get_module_hash())).encode())
+        return h.hexdigest()
+
+
+@cache
+def _get_module_hash() -> str:
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _to_canonical(value: Any) -> Any:
+    "Value with a stable 'repr' (no memory addresses)."
+    if isinstance(value, np.ndarray):
+        data = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return ("ndarray", str(value.dtype), value.shape, data)
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    if isinstance(value, list | tuple):
+        return tuple(_to_canonical(v) for v in value)
+
+    if isinstance(value, dict):
+        return tuple((_to_canonical(k), _to_canonical(v)) for k, v in value.items())
+
+    if isinstance(value, partial):
+        keywords = dict(sorted(value.keywords.items()))
+        return (
+            "partial",
+            _to_canonical(value.func),
+            _to_canonical(value.args),
+            _to_canonical(keywords),
+        )
+
+    if callable(value):
+        code = getattr(value, "__code__", None)
+        cells = getattr(value, "__closure__", None) or ()
+        name = f"{value.__module__}.{value.__qualname__}"
+
+        if code is None:
+            return ("callable", name)
+
+        # Code + closure: the same lambda with a different captured value
+        # gives a different hash.
+        consts = [
+            c.co_code.hex() if isinstance(c, CodeType) else c for c in code.co_consts
+        ]
+        closure = [_to_canonical(c.cell_contents) for c in cells]
+        return ("callable", name, code.co_code.hex(), repr(consts), closure)
+
+    return value
 
 
 # MARK: Helpers
@@ -541,7 +955,48 @@ def _write_img(
     width: int,
     aspect_rato: tuple[int, int] | None,
 ):
+    _set_size(fig, width, aspect_rato)
+    fig.savefig(
+        path,
+        facecolor=fig.get_facecolor(),
+        edgecolor=fig.get_edgecolor(),
+    )
+    plt.close(fig)
+
+
+def _get_svg(
+    fig: pltFigure.Figure,
+    width: int,
+    aspect_rato: tuple[int, int] | None,
+) -> str:
+    _set_size(fig, width, aspect_rato)
+    f = io.StringIO()
+    fig.savefig(
+        f,
+        format="svg",
+        facecolor=fig.get_facecolor(),
+        edgecolor=fig.get_edgecolor(),
+        metadata={"Date": None},
+    )
+    plt.close(fig)
+
+    # Inline: no xml declaration/doctype. Svg size is in 'pt' (72 per inch),
+    # the same figure as png is 'dpi' pixels per inch.
+    svg = f.getvalue()
+    svg = svg[svg.index("<svg") :]
+    height = fig.get_figheight() * fig.get_dpi()
+    size = f'width="{width}px" height="{round(height)}px"'
+    return _SVG_SIZE_REGEX.sub(size, svg, count=1)
+
 
+_SVG_SIZE_REGEX = re.compile(r'width="[0-9.]+pt" height="[0-9.]+pt"')
+
+
+def _set_size(
+    fig: pltFigure.Figure,
+    width: int,
+    aspect_rato: tuple[int, int] | None,
+):
     dpi = 100
     fig.set_dpi(dpi)
     fig.set_figwidth(width / dpi)
@@ -554,13 +1009,6 @@ def _write_img(
         height = width * a_height / a_width
         fig.set_figheight(height / dpi)
 
-    fig.savefig(
-        path,
-        facecolor=fig.get_facecolor(),
-        edgecolor=fig.get_edgecolor(),
-    )
-    plt.close(fig)
-
 
 def _create_colorbar_norm(cmap: pltColors.LinearSegmentedColormap, values: list):
     # https://matplotlib.org/stable/users/explain/colors/colorbar_only.html#discrete-and-extended-colorbar-with-continuous-colorscale
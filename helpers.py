@@ -1,4 +1,6 @@
+import heapq
 from typing import (
+    TYPE_CHECKING,
     Any,
     Iterator,
     Protocol,
@@ -6,6 +8,7 @@ from typing import (
     Callable,
     Generic,
     Iterable,
+    Sequence,
     assert_never,
 )
 from atp import (
@@ -19,6 +22,10 @@ from atp import (
     PlayerMatch_NotPlayed,
 )
 
+# Only the '_array' variants need NumPy.
+if TYPE_CHECKING:
+    import numpy as np
+
 T = TypeVar("T")
 U = TypeVar("U")
 
@@ -45,7 +52,7 @@ def filter_award_min(
     count: int,
     key: Callable[[THasPlayer], Any],
 ) -> list[THasPlayer]:
-    os = [o for o in iterable if _can_receive_award(o)]
+    os = (o for o in iterable if _can_receive_award(o))
     return _filter_award(os, count, key, is_max=False)
 
 
@@ -54,10 +61,28 @@ def filter_award_max(
     count: int,
     key: Callable[[THasPlayer], Any],
 ) -> list[THasPlayer]:
-    os = [o for o in iterable if _can_receive_award(o)]
+    os = (o for o in iterable if _can_receive_award(o))
     return _filter_award(os, count, key, is_max=True)
 
 
+def filter_award_min_array(
+    os: Sequence[THasPlayer],
+    count: int,
+    keys: "np.ndarray",
+) -> list[THasPlayer]:
+    "'filter_award_min' with precomputed keys: keys[i] is the key of os[i]."
+    return _filter_award_array(os, count, keys, is_max=False)
+
+
+def filter_award_max_array(
+    os: Sequence[THasPlayer],
+    count: int,
+    keys: "np.ndarray",
+) -> list[THasPlayer]:
+    "'filter_award_max' with precomputed keys: keys[i] is the key of os[i]."
+    return _filter_award_array(os, count, keys, is_max=True)
+
+
 def filter_award_min_NO_can_receive_award_check(
     iterable: Iterable[T],
     count: int,
@@ -80,24 +105,117 @@ def _filter_award(
     key: Callable[[T], Any],
     is_max: bool,
 ) -> list[T]:
-    os = [(o, key(o)) for o in iterable]
-    os_sorted = sorted(os, key=lambda o: o[1], reverse=is_max)
+    """
+    All of the objects with one of the 'count' best keys (multiple objects
+    can have the same key). Sorted by key, ties in the 'iterable' order.
+
+    Single pass, O(n log count): the heap holds the best keys seen so far,
+    with the worst of them at the top.
+    """
+    if count <= 0:
+        return []
+
+    heap = list[_HeapKey]()
+    key_to_os = dict[Any, list[T]]()
+
+    for o in iterable:
+        k = key(o)
+        os = key_to_os.get(k)
+
+        if os is not None:
+            os.append(o)
+            continue
+
+        heap_key = _HeapKey(k, is_max)
+
+        if len(heap) < count:
+            heapq.heappush(heap, heap_key)
+            key_to_os[k] = [o]
+        elif heap[0] < heap_key:
+            worst = heapq.heapreplace(heap, heap_key)
+            del key_to_os[worst.key]
+            key_to_os[k] = [o]
+
+    keys = sorted(key_to_os, reverse=is_max)
+    return [o for k in keys for o in key_to_os[k]]
+
+
+class _HeapKey:
+    "Heap top is the worst key: max for 'filter_award_min', min for '_max'."
 
-    result = list[T]()
-    unique_keys = list[Any]()  # Multiple entries with the same key
+    __slots__ = ("key", "is_max")
 
-    for o, k in os_sorted:
-        is_key_equal_previous = unique_keys and unique_keys[-1] == k
+    def __init__(self, key: Any, is_max: bool) -> None:
+        self.key = key
+        self.is_max = is_max
 
-        if not is_key_equal_previous:
-            unique_keys.append(k)
+    def __lt__(self, other: "_HeapKey") -> bool:
+        return self.key < other.key if self.is_max else other.key < self.key
 
-        if len(unique_keys) > count:
+
+def _filter_award_array(
+    os: Sequence[T],
+    count: int,
+    keys: "np.ndarray",
+    is_max: bool,
+) -> list[T]:
+    import numpy as np
+
+    assert len(os) == len(keys)
+    can_receive_award = np.fromiter(
+        (_can_receive_award(o) for o in os),  # type: ignore
+        dtype=bool,
+        count=len(os),
+    )
+
+    indices = np.flatnonzero(can_receive_award)
+    best = top_k_with_ties(keys[indices], count, is_max=is_max)
+    return [os[i] for i in indices[best]]
+
+
+def top_k_with_ties(keys: "np.ndarray", count: int, *, is_max: bool) -> "np.ndarray":
+    """
+    Vectorized '_filter_award': indices of the keys equal to one of the
+    'count' best unique keys. Sorted by key, ties in the index order.
+
+    Only the candidates are sorted, not the whole array.
+    """
+    import numpy as np
+
+    n = len(keys)
+
+    if n == 0 or count <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # Take 'candidate_count' best keys, if there are not enough unique values
+    # (a lot of ties) then take twice as many etc.
+    candidate_count = min(count, n)
+
+    while True:
+        if is_max:
+            candidates = np.partition(keys, n - candidate_count)[n - candidate_count :]
+        else:
+            candidates = np.partition(keys, candidate_count - 1)[:candidate_count]
+
+        unique = np.unique(candidates)
+
+        if len(unique) >= count or candidate_count == n:
             break
 
-        result.append(o)
+        candidate_count = min(candidate_count * 2, n)
 
-    return result
+    if is_max:
+        threshold = unique[-min(count, len(unique))]
+        indices = np.flatnonzero(keys >= threshold)
+        # Stable descending sort: sort reversed array and reverse the result.
+        selected = keys[indices][::-1]
+        order = np.argsort(selected, kind="stable")[::-1]
+        return indices[len(indices) - 1 - order]
+
+    threshold = unique[min(count, len(unique)) - 1]
+    indices = np.flatnonzero(keys <= threshold)
+    order = np.argsort(keys[indices], kind="stable")
+    return indices[order]
 
 
 def _can_receive_award(o: HasPlayer) -> bool:
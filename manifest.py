@@ -0,0 +1,81 @@
+import os
+import re
+import json
+import hashlib
+
+_REFERENCE_REGEX = re.compile(r"""(?:src|href)="([^"]*)"|url\(["']?([^"')]*)["']?\)""")
+_EXTENSIONS_WITH_REFERENCES = (".html", ".css")
+
+
+class BuildManifest:
+    """
+    Input hash of every written file (charts, page images) from the last build.
+    Same hash and the file exists -> it is up to date, no need to write it again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._path_to_hash = dict[str, str]()
+
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._path_to_hash = json.load(f)
+
+    def is_up_to_date(self, path: str, hash: str) -> bool:
+        key = os.path.realpath(path)
+        return self._path_to_hash.get(key) == hash and os.path.exists(path)
+
+    def set(self, path: str, hash: str):
+        "Call only after the file was successfully written."
+        self._path_to_hash[os.path.realpath(path)] = hash
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self._path_to_hash, f, indent=2, sort_keys=True)
+
+
+def get_page_hash(html_path: str, width: int) -> str:
+    """
+    Hash of the html and of all of the files that it references
+    (images, css and the files referenced from css: fonts etc.).
+    Charts have to be written before calling this.
+    """
+    h = hashlib.sha256()
+    h.update(str(width).encode())
+    _add_file(h, html_path, set())
+    return h.hexdigest()
+
+
+def _add_file(h: "hashlib._Hash", path: str, visited: set[str]):
+    path = os.path.realpath(path)
+
+    if path in visited:
+        return
+
+    visited.add(path)
+    h.update(path.encode())
+
+    if not os.path.exists(path):
+        h.update(b"missing")
+        return
+
+    with open(path, "rb") as f:
+        content = f.read()
+
+    h.update(hashlib.sha256(content).digest())
+    _, extension = os.path.splitext(path)
+
+    if extension not in _EXTENSIONS_WITH_REFERENCES:
+        return
+
+    dir_path = os.path.dirname(path)
+    text = content.decode("utf-8", errors="replace")
+
+    for match in _REFERENCE_REGEX.finditer(text):
+        reference = match.group(1) or match.group(2)
+
+        if not reference or reference.startswith(("http:", "https:", "data:", "#")):
+            continue
+
+        reference = reference.removeprefix("file:")
+        _add_file(h, os.path.join(dir_path, reference), visited)
@@ -0,0 +1,143 @@
+import os
+import numpy as np
+from matplotlib.path import Path
+
+SHP_PATH = "assets/ne_110m_admin_0_countries.shp"
+GEOMETRY_PATH = "assets/ne_110m_admin_0_countries.npz"
+"Generated from 'SHP_PATH', run 'python3 -m map_geometry' after updating the shp."
+
+
+class MapGeometry:
+    """
+    Country polygons as NumPy arrays (shapely ragged array layout):
+    coords[ring_offsets[i]:ring_offsets[i + 1]] is the ring i,
+    polygon j has rings [polygon_offsets[j], polygon_offsets[j + 1]),
+    the 1st one is the exterior, the rest are holes,
+    country k has polygons [country_offsets[k], country_offsets[k + 1]).
+
+    Coordinates are in the shp crs (longitude, latitude), which is also
+    the crs of the map. Centroids are calculated in an equal area projection
+    (EPSG:3035) and converted back.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        centroids: np.ndarray,
+        coords: np.ndarray,
+        ring_offsets: np.ndarray,
+        polygon_offsets: np.ndarray,
+        country_offsets: np.ndarray,
+        crs: str,
+    ) -> None:
+        self.codes = codes
+        "ADM0_A3, in the shp order (= draw order)."
+        self.centroids = centroids
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.polygon_offsets = polygon_offsets
+        self.country_offsets = country_offsets
+        self.crs = crs
+        "EPSG:4326, longitude and latitude."
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get_paths(self) -> list[Path]:
+        "Matplotlib path for every country: all of its rings, holes included."
+        codes = np.full(len(self.coords), Path.LINETO, dtype=Path.code_type)
+        codes[self.ring_offsets[:-1]] = Path.MOVETO
+
+        country_ring_offsets = self.ring_offsets[self.polygon_offsets]
+        starts = country_ring_offsets[self.country_offsets[:-1]].tolist()
+        ends = country_ring_offsets[self.country_offsets[1:]].tolist()
+        return [Path(self.coords[s:e], codes[s:e]) for s, e in zip(starts, ends)]
+
+    def to_shapely(self) -> np.ndarray:
+        "Polygon or MultiPolygon for every country (same as in the shp)."
+        import shapely
+
+        offsets = (self.ring_offsets, self.polygon_offsets, self.country_offsets)
+        result = shapely.from_ragged_array(
+            shapely.GeometryType.MULTIPOLYGON,
+            self.coords,
+            offsets,
+        )
+
+        is_single = shapely.get_num_geometries(result) == 1
+        result[is_single] = shapely.get_geometry(result[is_single], 0)
+        return result
+
+
+def get_map_geometry(path: str = GEOMETRY_PATH) -> MapGeometry:
+    "Cached, do not modify the result."
+    result = _CACHE.get(path)
+
+    if result is None:
+        with np.load(path) as f:
+            result = MapGeometry(
+                f["codes"],
+                f["centroids"],
+                f["coords"],
+                f["ring_offsets"],
+                f["polygon_offsets"],
+                f["country_offsets"],
+                str(f["crs"]),
+            )
+
+        _CACHE[path] = result
+
+    return result
+
+
+_CACHE = dict[str, MapGeometry]()
+
+
+def create_map_geometry(shp_path: str) -> MapGeometry:
+    "Read and project the shp (slow, requires 'geopandas')."
+    import shapely
+    import geopandas as gpd
+
+    data = gpd.read_file(shp_path)
+    assert isinstance(data, gpd.GeoDataFrame)
+
+    proj = data.to_crs(epsg=3035)
+    assert isinstance(proj, gpd.GeoDataFrame)
+    centroid = proj.geometry.centroid.to_crs(data.crs)
+    centroids = np.column_stack([centroid.x, centroid.y])
+
+    type, coords, offsets = shapely.to_ragged_array(data.geometry.values)
+    assert type == shapely.GeometryType.MULTIPOLYGON, type
+    ring_offsets, polygon_offsets, country_offsets = offsets
+
+    codes = data["ADM0_A3"].to_numpy(dtype=str)
+    return MapGeometry(
+        codes,
+        centroids,
+        coords,
+        ring_offsets,
+        polygon_offsets,
+        country_offsets,
+        data.crs.to_string(),
+    )
+
+
+def save_map_geometry(geometry: MapGeometry, path: str):
+    # Not compressed: loading is the hot path, the file is small anyway.
+    np.savez(
+        path,
+        codes=geometry.codes,
+        centroids=geometry.centroids,
+        coords=geometry.coords,
+        ring_offsets=geometry.ring_offsets,
+        polygon_offsets=geometry.polygon_offsets,
+        country_offsets=geometry.country_offsets,
+        crs=geometry.crs,
+    )
+
+
+if __name__ == "__main__":
+    geometry = create_map_geometry(SHP_PATH)
+    save_map_geometry(geometry, GEOMETRY_PATH)
+    size = os.path.getsize(GEOMETRY_PATH)
+    print(f"{GEOMETRY_PATH}: {len(geometry)} countries, {size // 1024} KiB")
@@ -1,6 +1,6 @@
 from typing import Literal, assert_never
 from dataclasses import dataclass
-from atp import Player
+from atp import Player, Date, format_date_short
 from chart import Chart
 from helpers import *
 
@@ -15,11 +15,11 @@ class Page:
     class Row:
         player: Player
         rank_now: int
-        "Current rank."
+        "Rank at the date of the ranking."
         rank_past: int
         "Rank at the start of the period."
         rank_highest: int
-        "Highest obtained rank: 1, 2, 3…."
+        "Highest obtained rank between the past and current date: 1, 2, 3…."
         rank_lowest: int
         "Lowest obtained rank: 99, 98, 97…."
 
@@ -48,27 +48,32 @@ class Page:
 
 
 def page1_ranking(
-    date_past: str,
+    date_past: Date,
     ranking_past: list[Player],
-    date_now: str,
+    date_now: Date,
     ranking_now: list[Player],
+    ranks: dict[str, int],
     award_count_rank_gain_lose: int,
     award_count_spread: int,
 ) -> Page:
     rows = _get_rows(
         ranking_now,
         date_past=date_past,
+        date_now=date_now,
+        ranks=ranks,
         on_current_rank_none="throw",
     )
 
     rows_past = _get_rows(
         ranking_past,
         date_past=date_past,
+        date_now=date_now,
+        ranks=ranks,
         on_current_rank_none="ignore",
     )
 
-    date_now_short = substring_until(date_now, "T")
-    date_past_short = substring_until(date_past, "T")
+    date_now_short = format_date_short(date_now)
+    date_past_short = format_date_short(date_past)
     player_no_1 = find(rows, lambda r: r.rank_now == 1)
 
     # Rank change
@@ -203,13 +208,16 @@ def _create_rank_spread_chart(rows: list[Page.Row]) -> Chart:
 
 def _get_rows(
     players: list[Player],
-    date_past: str,
+    date_past: Date,
+    date_now: Date,
+    ranks: dict[str, int],
     on_current_rank_none: Literal["throw", "ignore"],
 ) -> list[Page.Row]:
+    "'ranks': rank at 'date_now' of every ranked player."
     result = list[Page.Row]()
 
     for p in players:
-        rank_now = p.rank
+        rank_now = ranks.get(p.id)
 
         if rank_now is None:
             if on_current_rank_none == "throw":
@@ -231,7 +239,7 @@ def _get_rows(
                 rank_past = r.rank
 
             # Smaller number -> higher rank
-            if r.date >= date_past:
+            if date_past <= r.date <= date_now:
                 rank_lowest = max2(rank_lowest, r.rank)
                 rank_highest = min2(rank_highest, r.rank)
 
@@ -1,16 +1,17 @@
 from typing import assert_never
 from dataclasses import dataclass
 from atp import (
+    Date,
+    format_date_short,
     Player,
     PlayerTournament,
     PlayerMatch_Played,
     PlayerMatch_Walkover,
     PlayerMatch_Retire,
     PlayerMatch_Default,
-    PlayerMatch_Bye,
-    PlayerMatch_NotPlayed,
 )
 from chart import Chart
+from season import HeadToHead, get_seasons, get_head_to_head
 from helpers import *
 
 
@@ -71,13 +72,17 @@ class Page:
 
 def page2_game_set_match(
     players: list[Player],
-    date_from: str,
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
     top_N: int,
     award_count_unlucky: int,
 ) -> Page:
-    rows = _get_rows(players, date_from, top_N)
-    date_from_short = substring_until(date_from, "T")
-    versus_chart = _create_versus_chart(rows)
+    "Matches from the tournaments that started in [date_from, date_to)."
+    rows = _get_rows(players, ranks, date_from, date_to, top_N)
+    head_to_head = get_head_to_head(players, date_from, date_to)
+    date_from_short = format_date_short(date_from)
+    versus_chart = _create_versus_chart(rows, head_to_head, ranks)
 
     versus_awards_lucky = [r for r in rows if r.player_rank <= top_N]
     versus_awards_lucky.sort(key=lambda r: r.top_N_count)
@@ -95,7 +100,7 @@ def page2_game_set_match(
         r for r in unlucky_rows if r.top_N_count != unlucky_rows_max
     ]
 
-    versus_awards_love = _get_love_rows(rows, top_N)
+    versus_awards_love = _get_love_rows(head_to_head, ranks, top_N)
 
     return Page(
         date_from=date_from_short,
@@ -111,28 +116,23 @@ def page2_game_set_match(
 # MARK: Charts
 
 
-def _create_versus_chart(rows: list[Page.Row]) -> Chart:
+def _create_versus_chart(
+    rows: list[Page.Row],
+    head_to_head: HeadToHead,
+    ranks: dict[str, int],
+) -> Chart:
     chart = Chart()
     chart.set_show_grid(True)
     chart.set_aspect_rato(12, 10)
 
     rank_lowest = max(r.player_rank for r in rows)
     rank_highest = min(r.player_rank for r in rows)
-    rank_span = rank_lowest - rank_highest + 1
-
-    chart_data = [[0] * rank_span for _ in range(rank_span)]
 
     # Transpose to count per opponent
-    for r in rows:
-        # -1 for '0' indexing
-        x = r.player_rank - 1
-
-        for m in r.matches:
-            y = m.opponent_rank - 1
-            chart_data[x][y] += 1
+    chart_data = head_to_head.get_rank_heatmap(ranks, rank_highest, rank_lowest)
 
-    ranks = range(rank_highest, rank_lowest + 1)
-    heatmap = chart.add_heatmap(ranks, ranks, chart_data)
+    rank_axis = range(rank_highest, rank_lowest + 1)
+    heatmap = chart.add_heatmap(rank_axis, rank_axis, chart_data)
     chart.add_color_bar(heatmap, "Match count")
 
     # X axis
@@ -151,117 +151,78 @@ def _create_versus_chart(rows: list[Page.Row]) -> Chart:
 # MARK: Rows
 
 
-def _get_rows(players: list[Player], date_from: str, top_N: int) -> list[Page.Row]:
+def _get_rows(
+    players: list[Player],
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
+    top_N: int,
+) -> list[Page.Row]:
     result = list[Page.Row]()
-    id_to_player = {p.id: p for p in players}
 
-    for p in players:
-        p_rank = p.rank
-        assert p_rank is not None
+    for s in get_seasons(players, date_from, date_to):
+        p = s.player
+        p_rank = ranks[p.id]
         row = Page.Row(p, p_rank, [], [], 0, 0)
         result.append(row)
 
-        for t in p.career_tournaments:
-            if t.date < date_from:
-                continue
-
-            for m in t.matches:
-                if isinstance(m, Page.Row.MatchData):
-                    o_id = m.opponent.id
-                    o = id_to_player.get(o_id)
+        for v in s.versus:
+            m = v.match
+            o = v.opponent
+            o_rank = ranks[o.id]
+            match = Page.Row.Match(v.tournament, m, o, o_rank)
+            row.matches.append(match)
 
-                    # None -> player not in the top 10/50/100 etc.
-                    if o is None:
-                        continue
+            if o_rank <= top_N:
+                row.top_N_matches.append(match)
 
-                    assert o.rank is not None
-                    match = Page.Row.Match(t, m, o, o.rank)
-                    row.matches.append(match)
-
-                    if o.rank <= top_N:
-                        row.top_N_matches.append(match)
-
-                        if m.win_loss == "W":
-                            row.top_N_win_count += 1
-                        elif m.win_loss == "L":
-                            row.top_N_loss_count += 1
-                        else:
-                            assert_never(m.win_loss)
-
-                elif isinstance(m, PlayerMatch_Bye | PlayerMatch_NotPlayed):
-                    pass
+                if m.win_loss == "W":
+                    row.top_N_win_count += 1
+                elif m.win_loss == "L":
+                    row.top_N_loss_count += 1
                 else:
-                    assert_never(m)
+                    assert_never(m.win_loss)
 
     return result
 
 
-def _get_love_rows(rows: list[Page.Row], top_N: int) -> list[Page.LoveRow]:
-    # pair_id = concatenated player ids
-    pair_id_to_matches = dict[str, list[tuple[Page.Row, Page.Row.Match]]]()
-
-    for r in rows:
-        for m in r.matches:
-            # Both of them need to be able to receive award
-            can_receive_award = (
-                r.player.can_receive_award and m.opponent.can_receive_award
-            )
-
-            if not can_receive_award:
-                continue
-
-            # Remove top N player pairs, as they play very often together.
-            if r.player_rank <= top_N and m.opponent_rank <= top_N:
-                continue
+def _get_love_rows(
+    head_to_head: HeadToHead,
+    ranks: dict[str, int],
+    top_N: int,
+) -> list[Page.LoveRow]:
 
-            p1_id, p2_id = sorted((r.player.id, m.opponent.id))
-            pair_id = f"{p1_id}_{p2_id}"
-            matches = pair_id_to_matches.get(pair_id)
+    def is_love_pair(pair: HeadToHead.Pair) -> bool:
+        p1 = pair.player1
+        p2 = pair.player2
 
-            if matches is None:
-                matches = []
-                pair_id_to_matches[pair_id] = matches
+        # Both of them need to be able to receive award
+        if not (p1.can_receive_award and p2.can_receive_award):
+            return False
 
-            matches.append((r, m))
+        # Remove top N player pairs, as they play very often together.
+        return not (ranks[p1.id] <= top_N and ranks[p2.id] <= top_N)
 
     result = list[Page.LoveRow]()
-    max_len = max(len(mhs) for mhs in pair_id_to_matches.values())
-
-    for matches in pair_id_to_matches.values():
-        if len(matches) != max_len:
-            continue
-
-        r, m = matches[0]
-        player = r.player
-        opponent = m.opponent
-        winner_ids = list[str]()
 
+    for pair in head_to_head.get_most_played(1, is_love_pair):
+        player = pair.player1
+        opponent = pair.player2
         love_row = Page.LoveRow(player, opponent, [], None)
         result.append(love_row)
 
-        for r, m in matches:
-            win_loss = m.match.win_loss
-
-            if win_loss == "L":
-                continue
-
-            assert win_loss == "W", win_loss
-
-            winner = r.player
-            winner_ids.append(winner.id)
-            lm = Page.LoveRow.Match(m.tournament, m.match, winner)
-            love_row.matches.append(lm)
+        for winner, wins in ((player, pair.player1_wins), (opponent, pair.player2_wins)):
+            for v in wins:
+                lm = Page.LoveRow.Match(v.tournament, v.match, winner)
+                love_row.matches.append(lm)
 
-        # We have matches for both sides.
-        match_count = len(matches) // 2
+        match_count = pair.match_count
         match_count_to_top = match_count * 2 / 3  # 66%
-        player_win_count = winner_ids.count(player.id)
-        opponent_win_count = winner_ids.count(opponent.id)
 
-        if player_win_count >= match_count_to_top:
+        if pair.player1_win_count >= match_count_to_top:
             love_row.dominant_player = player
 
-        if opponent_win_count >= match_count_to_top:
+        if pair.player2_win_count >= match_count_to_top:
             love_row.dominant_player = opponent
 
     return result
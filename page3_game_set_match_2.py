@@ -2,15 +2,16 @@ from typing import assert_never
 from dataclasses import dataclass
 from chart import Chart
 from atp import (
+    Date,
+    format_date_short,
     Player,
     PlayerTournament,
     PlayerMatch_Played,
     PlayerMatch_Walkover,
     PlayerMatch_Retire,
     PlayerMatch_Default,
-    PlayerMatch_Bye,
-    PlayerMatch_NotPlayed,
 )
+from season import get_seasons
 from helpers import *
 
 
@@ -72,14 +73,22 @@ class Page:
 
 def page3_game_set_match_2(
     players: list[Player],
-    date_from: str,
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
     award_count_highest_defeated: int,
     award_count_game_count: int,
 ) -> Page:
-    date_from_short = substring_until(date_from, "T")
-    player_no_1 = find(players, lambda r: r.rank == 1)
-
-    highest_defeated_rows = _get_highest_defeated_rows(players, date_from)
+    "Matches from the tournaments that started in [date_from, date_to)."
+    date_from_short = format_date_short(date_from)
+    player_no_1 = find(players, lambda p: ranks[p.id] == 1)
+
+    highest_defeated_rows = _get_highest_defeated_rows(
+        players,
+        ranks,
+        date_from,
+        date_to,
+    )
     highest_defeated_chart = _highest_defeated_chart(highest_defeated_rows)
     highest_defeated_awards, giant_slayer = _get_highest_defeated_awards(
         highest_defeated_rows,
@@ -93,7 +102,7 @@ def page3_game_set_match_2(
     ]
     defeated_no_1_awards.sort(key=lambda r: r.tournament.date)
 
-    game_count_rows = get_game_count_rows(players, date_from)
+    game_count_rows = get_game_count_rows(players, ranks, date_from, date_to)
     game_count_chart = _game_count_chart(game_count_rows)
     game_count_awards_max = filter_award_max(
         game_count_rows,
@@ -237,104 +246,51 @@ def _get_highest_defeated_awards(
 
 def _get_highest_defeated_rows(
     players: list[Player],
-    date_from: str,
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
 ) -> list[Page.HighestDefeatedRow]:
     result = list[Page.HighestDefeatedRow]()
-    id_to_player = {p.id: p for p in players}
 
-    for p in players:
-        p_rank = p.rank
-        assert p_rank is not None
+    for s in get_seasons(players, date_from, date_to):
+        p = s.player
+        p_rank = ranks[p.id]
+
+        for v in s.versus:
+            m = v.match
+            o = v.opponent
 
-        for t in p.career_tournaments:
-            if t.date < date_from:
+            if m.win_loss == "W":
+                pass
+            elif m.win_loss == "L":
                 continue
+            else:
+                assert_never(m.win_loss)
 
-            for m in t.matches:
-                if m.win_loss == "W":
-                    pass
-                elif m.win_loss == "L":
-                    continue
-                else:
-                    assert_never(m.win_loss)
-
-                if isinstance(m, Page.HighestDefeatedRow.Data):
-                    o_id = m.opponent.id
-                    o = id_to_player.get(o_id)
-
-                    if o is not None:
-                        assert o.rank is not None
-                        result.append(
-                            Page.HighestDefeatedRow(t, m, p, p_rank, o, o.rank)
-                        )
-
-                elif isinstance(m, PlayerMatch_Bye | PlayerMatch_NotPlayed):
-                    pass
-                else:
-                    assert_never(m)
+            result.append(
+                Page.HighestDefeatedRow(v.tournament, m, p, p_rank, o, ranks[o.id])
+            )
 
     return result
 
 
 def get_game_count_rows(
-    players: list[Player], date_from: str
+    players: list[Player],
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
 ) -> list[Page.GameCountRow]:
     result = list[Page.GameCountRow]()
 
-    for p in players:
-        p_rank = p.rank
-        assert p_rank is not None
-        row = Page.GameCountRow(p, p_rank, 0, 0, 0, 0)
+    for s in get_seasons(players, date_from, date_to):
+        row = Page.GameCountRow(
+            s.player,
+            ranks[s.player.id],
+            s.game_win_count,
+            s.game_win_tie_break_count,
+            s.game_lost_count,
+            s.game_lost_tie_break_count,
+        )
         result.append(row)
 
-        for t in p.career_tournaments:
-            if t.date < date_from:
-                continue
-
-            for m in t.matches:
-                if isinstance(
-                    m,
-                    PlayerMatch_Played | PlayerMatch_Retire | PlayerMatch_Default,
-                ):
-                    for s in m.sets:
-                        row.game_win_count += s.player
-                        row.game_lost_count += s.opponent
-
-                        if s.tie_break is not None:
-                            # 7:6
-                            if s.player == 7:
-                                assert s.opponent == 6
-                                row.game_win_count -= 1
-                                row.game_win_tie_break_count += 1
-                            elif s.opponent == 7:
-                                assert s.player == 6
-                                row.game_lost_count -= 1
-                                row.game_lost_tie_break_count += 1
-                            # 1:0
-                            elif s.player == 1:
-                                assert s.opponent == 0
-                                row.game_win_tie_break_count += 1
-                            elif s.opponent == 1:
-                                assert s.player == 0
-                                row.game_lost_tie_break_count += 1
-                            # 4:3 - ATP Next Gen 2024
-                            elif s.player == 4:
-                                assert s.opponent == 3
-                                row.game_win_tie_break_count += 1
-                            elif s.opponent == 4:
-                                assert s.player == 3
-                                row.game_lost_tie_break_count += 1
-                            # Other?
-                            else:
-                                assert False, "Tie-break requires 7:6, 4:3, 1:0"
-
-                elif isinstance(
-                    m,
-                    PlayerMatch_Bye | PlayerMatch_NotPlayed | PlayerMatch_Walkover,
-                ):
-                    pass
-
-                else:
-                    assert_never(m)
-
     return result
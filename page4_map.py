@@ -7,6 +7,7 @@ from atp import (
     get_all_continents,
 )
 from chart import Map, MapData
+from map_geometry import get_map_geometry
 from helpers import *
 
 
@@ -43,6 +44,7 @@ class Page:
 
 def page4_map(
     players: list[Player],
+    ranks: dict[str, int],
     award_count_best_countries: int,
     award_count_best_player_per_continent: int,
 ) -> Page:
@@ -74,7 +76,7 @@ def page4_map(
                 if p.can_receive_award and filter(p.nationality.continent)
             ),
             award_count_best_player_per_continent,
-            key=lambda p: p.rank,
+            key=lambda p: ranks[p.id],
         )
 
     continent_awards_europe = continent_best(lambda c: c.id == "EU")
@@ -104,8 +106,8 @@ def _create_map(countries: list[Page.CountryPlayers]) -> Map:
     map.set_aspect_rato(1400, 550)
     map.set_latitude_range(-60, 90)  # Cut Antarctica
 
-    data = MapData("assets/ne_110m_admin_0_countries.shp")
-    data.calculate_centroid("CENTROID")
+    geometry = get_map_geometry()
+    data = MapData(geometry)
 
     alpha3_to_country = {c.country.alpha3.lower(): c for c in countries}
     alpha3_to_label_adjustment = {
@@ -118,16 +120,15 @@ def _create_map(countries: list[Page.CountryPlayers]) -> Map:
         "aus": (3, -2),
     }
 
-    for row in data.iter_rows():
-        alpha3: str = row["ADM0_A3"].lower()
+    for index, code in enumerate(geometry.codes.tolist()):
+        alpha3 = code.lower()
         country = alpha3_to_country.pop(alpha3, None)
 
         players_len = country.players_len if country else 0
-        row["VALUE"] = players_len
+        data.values[index] = players_len
 
         if players_len != 0:
-            centroid = row["CENTROID"]
-            x, y = centroid.coords[0]
+            x, y = geometry.centroids[index].tolist()
             dx, dy = alpha3_to_label_adjustment.get(alpha3, (0, 0))
             x += dx
             y += dy
@@ -135,5 +136,5 @@ def _create_map(countries: list[Page.CountryPlayers]) -> Map:
 
     assert not alpha3_to_country, f"Unable to map country to shape: {alpha3_to_country}"
 
-    map.add_data(data, column_name="VALUE")
+    map.add_data(data)
     return map
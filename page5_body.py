@@ -1,13 +1,11 @@
+import numpy as np
 from typing import Literal
-from datetime import datetime, timedelta
+from datetime import date
 from dataclasses import dataclass
-from atp import Player
+from atp import Date, Player, to_date
 from chart import Chart
 from helpers import *
 
-_NOW = datetime.now()
-_TODAY = datetime(_NOW.year, _NOW.month, _NOW.day)
-
 
 @dataclass
 class Page:
@@ -23,15 +21,11 @@ class Page:
         weight_kg: int
         hand_play: Literal["R", "L"]
         hand_back: Literal["1", "2"]
+        has_birthday: bool
 
         @property
         def birthday(self) -> str:
-            return substring_until(self.player.birth_date, "T")
-
-        @property
-        def has_birthday(self) -> bool:
-            b = datetime.fromisoformat(self.player.birth_date)
-            return b.day == _TODAY.day and b.month == _TODAY.month
+            return self.player.birth_date_short
 
         @property
         def years_since_pro(self) -> int:
@@ -61,15 +55,18 @@ class Page:
 
 def page5_body(
     players: list[Player],
+    ranks: dict[str, int],
+    date_now: Date,
     award_count_age: int,
     award_count_height: int,
     award_count_weight: int,
 ) -> Page:
-    rows = _get_rows(players)
+    "Ages at 'date_now', the rest is from the current player profiles."
+    rows, age_decimals = _get_rows(players, ranks, date_now)
 
     age_chart = _create_age_chart(rows)
-    age_awards_min = filter_award_min(rows, award_count_age, lambda r: r.age_decimal)
-    age_awards_max = filter_award_max(rows, award_count_age, lambda r: r.age_decimal)
+    age_awards_min = filter_award_min_array(rows, award_count_age, age_decimals)
+    age_awards_max = filter_award_max_array(rows, award_count_age, age_decimals)
 
     height_chart, height_awards_min, height_awards_max = _height_weight(
         rows,
@@ -249,58 +246,79 @@ def _height_weight(
 # MARK: Rows
 
 
-def _get_rows(players: list[Player]) -> list[Page.Row]:
-    result = list[Page.Row]()
-
-    for p in players:
-        assert p.rank
+def _get_rows(
+    players: list[Player],
+    ranks: dict[str, int],
+    date_now: Date,
+) -> tuple[list[Page.Row], np.ndarray]:
+    "Rows and 'Row.age_decimal' of every row (award keys)."
+    birth_dates = np.array([p.birth_date for p in players], dtype=np.int64)
+    ages = _get_ages(birth_dates, to_date(date_now))
 
-        birth_date_str = p.birth_date
-        birth_date = datetime.fromisoformat(birth_date_str)
-        age_years, age_days = _date_diff_years_days(birth_date, _TODAY)
+    pro_years = np.array([p.pro_year or 0 for p in players], dtype=np.int64)
+    ages_pro = np.where(pro_years == 0, 0, pro_years - ages.birth_year)
 
-        if p.pro_year is None:
-            age_pro = 0
-        else:
-            age_pro = p.pro_year - birth_date.year
+    result = list[Page.Row]()
 
+    for i, p in enumerate(players):
         # p_str = to_str_player(p)
         # print(f"{p_str} | {p.birth_date} | {age_years}y {age_days}d | {age_pro} y")
 
         result.append(
             Page.Row(
                 p,
-                p.rank,
-                age_years,
-                age_days,
-                age_pro,
+                ranks[p.id],
+                int(ages.years[i]),
+                int(ages.days[i]),
+                int(ages_pro[i]),
                 p.height_cm,
                 p.weight_kg,
                 p.hand_play,
                 p.hand_back,
+                bool(ages.has_birthday[i]),
             )
         )
 
-    return result
+    age_decimals = ages.years + ages.days / 366.0
+    return result, age_decimals
+
+
+@dataclass
+class _Ages:
+    birth_year: np.ndarray
+    years: np.ndarray
+    days: np.ndarray
+    "Days since the last birthday."
+    has_birthday: np.ndarray
+
+
+def _get_ages(birth_dates: np.ndarray, today: date) -> _Ages:
+    "'birth_dates' are 'date.toordinal', computed for all of the players at once."
+    births = (birth_dates - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    birth_years = births.astype("datetime64[Y]")
+    birth_months = births.astype("datetime64[M]")
+    # Offsets from the start of the year/month: January is 0, 1st is 0.
+    month = birth_months - birth_years.astype("datetime64[M]")
+    day = births - birth_months.astype("datetime64[D]")
+
+    now = np.datetime64(today, "D")
+    now_year = now.astype("datetime64[Y]")
 
+    def birthday_in(year: np.datetime64) -> np.ndarray:
+        # 29th of February in a non-leap year -> 1st of March
+        return (year.astype("datetime64[M]") + month).astype("datetime64[D]") + day
 
-def _date_diff_years_days(past: datetime, now: datetime) -> tuple[int, int]:
-    now = datetime(year=now.year, month=now.month, day=now.day)
-    year_count = now.year - past.year
-    last_birthday = datetime(year=now.year, month=past.month, day=past.day)
-    had_birthday = now >= last_birthday
+    birthday_this_year = birthday_in(now_year)
+    birthday_last_year = birthday_in(now_year - 1)
+    had_birthday = now >= birthday_this_year
+    last_birthday = np.where(had_birthday, birthday_this_year, birthday_last_year)
 
-    if not had_birthday:
-        year_count -= 1
-        last_birthday = datetime(year=now.year - 1, month=past.month, day=past.day)
+    birth_year = birth_years.astype(np.int64) + 1970
+    years = now_year.astype(np.int64) + 1970 - birth_year - ~had_birthday
+    days = (now - last_birthday).astype(np.int64)
+    has_birthday = now == birthday_this_year
 
-    day_count = 0
-    day_count_day = last_birthday
-    day = timedelta(days=1)
+    return _Ages(birth_year, years, days, has_birthday)
 
-    while day_count_day != now:
-        day_count_day += day
-        day_count += 1
 
-    # print(f"{past} | {year_count} years {day_count} days")
-    return year_count, day_count
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
@@ -1,13 +1,13 @@
 import numpy as np
-from datetime import datetime
+from functools import partial
 from dataclasses import dataclass
-from atp import Player
+from atp import Date, Player, to_date
 from chart import Chart
+from season import get_seasons
 from helpers import *
 
 _THOUSAND = 1000
 _MILLION = _THOUSAND * _THOUSAND
-_YEAR = datetime.now().year
 
 
 @dataclass
@@ -18,6 +18,7 @@ class Page:
         player: Player
         rank: int
         year_became_pro: int | None
+        year_now: int
         games_count: int
         income_ytd: int
         income_ytd_str: str
@@ -29,7 +30,7 @@ class Page:
             if self.year_became_pro is None:
                 return 0
 
-            year_count = _YEAR - self.year_became_pro + 1
+            year_count = self.year_now - self.year_became_pro + 1
             return self.income_career / year_count
 
     ytd_chart: Chart
@@ -39,15 +40,25 @@ class Page:
     total_average_per_year_chart: Chart
 
 
-def page6_income(players: list[Player]) -> Page:
-    rows = _get_rows(players)
+def page6_income(
+    players: list[Player],
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
+    stats_season: int,
+) -> Page:
+    """
+    Prize money from the tournaments (singles): ytd in [date_from, date_to),
+    career before 'date_to'. Not from the current player profiles.
+    """
+    rows = _get_rows(players, ranks, date_from, date_to, stats_season)
 
-    ranks = [r.rank for r in rows]
+    row_ranks = [r.rank for r in rows]
 
     ytd = [r.income_ytd for r in rows]
     ytd_avg = average(ytd)
     ytd_chart = _create_income_chart(
-        ranks,
+        row_ranks,
         ytd,
         y_axis_label="Income [$1M]",
         y_axis_scale=_MILLION,
@@ -62,7 +73,7 @@ def page6_income(players: list[Player]) -> Page:
     ytd_per_game = [r.income_ytd / r.games_count for r in rows]
     ytd_per_game_avg = average(ytd_per_game)
     ytd_per_game_chart = _create_income_chart(
-        ranks,
+        row_ranks,
         ytd_per_game,
         y_axis_label="Income [$1k]",
         y_axis_scale=_THOUSAND,
@@ -74,7 +85,7 @@ def page6_income(players: list[Player]) -> Page:
     total = [r.income_career for r in rows]
     total_avg = average(total)
     total_chart = _create_income_chart(
-        ranks,
+        row_ranks,
         total,
         y_axis_label="Income [$1M]",
         y_axis_scale=_MILLION,
@@ -85,7 +96,7 @@ def page6_income(players: list[Player]) -> Page:
     total_per_year = [r.avg_income_per_year for r in rows]
     total_per_year_avg = average(i for i in total_per_year if i != 0)
     total_average_per_year_chart = _create_income_chart(
-        ranks,
+        row_ranks,
         total_per_year,
         y_axis_label="Income [$1M or 0 if no data available]",
         y_axis_scale=_MILLION,
@@ -168,18 +179,21 @@ def _create_income_chart(
     # y_axis.set_major_ticks(spread)
     y_axis.set_major_tick_interval(y_axis_tick_interval)
 
-    def format_y_tick(value: float, pos) -> str:
-        x = value / y_axis_scale
-        s = str(x)
+    # 'partial' and not a closure, so that the chart can be pickled.
+    format_y_tick = partial(_format_y_tick, y_axis_scale)
+    y_axis.set_major_formatter_fn(format_y_tick)
 
-        if s.endswith(".0"):
-            s = s[:-2]
+    return chart
 
-        return s
 
-    y_axis.set_major_formatter_fn(format_y_tick)
+def _format_y_tick(y_axis_scale: int, value: float, pos) -> str:
+    x = value / y_axis_scale
+    s = str(x)
 
-    return chart
+    if s.endswith(".0"):
+        s = s[:-2]
+
+    return s
 
 
 def _format_money_as_int(n: float) -> str:
@@ -195,35 +209,36 @@ def _format_money_as_int(n: float) -> str:
     return result
 
 
-def _get_rows(players: list[Player]) -> list[Page.Row]:
-
-    def parse_money(s: str) -> tuple[int, str]:
-        assert s.startswith("$")
-        i = s.strip("$")
-        i = i.replace(",", "")
-        return int(i), s
-
+def _get_rows(
+    players: list[Player],
+    ranks: dict[str, int],
+    date_from: Date,
+    date_to: Date,
+    stats_season: int,
+) -> list[Page.Row]:
+    seasons = get_seasons(players, date_from, date_to)
+    year_now = to_date(date_to).year
     result = list[Page.Row]()
 
-    for p in players:
-        assert p.rank
-
-        income_ytd, income_ytd_str = parse_money(p.ytd_prize_formatted)
-        income_career, income_career_str = parse_money(p.career_prize_formatted)
+    for p, season in zip(players, seasons):
+        income_ytd = sum(t.prize_usd for t in season.tournaments)
+        income_career = sum(t.prize_usd for t in p.get_tournaments(None, date_to))
 
-        games_count_service = p.ytd_stats_service.games_played
-        games_count_return = p.ytd_stats_return.games_played
+        stats_service, stats_return = p.get_stats(stats_season)
+        games_count_service = stats_service.games_played
+        games_count_return = stats_return.games_played
         games_count = games_count_service + games_count_return
 
         r = Page.Row(
             player=p,
-            rank=p.rank,
+            rank=ranks[p.id],
             year_became_pro=p.pro_year,
+            year_now=year_now,
             games_count=games_count,
             income_ytd=income_ytd,
-            income_ytd_str=income_ytd_str,
+            income_ytd_str="$" + _format_money_as_int(income_ytd),
             income_career=income_career,
-            income_career_str=income_career_str,
+            income_career_str="$" + _format_money_as_int(income_career),
         )
 
         result.append(r)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from atp import (
+    Date,
     Player,
     PlayerTournament,
     PlayerMatch,
@@ -11,7 +12,7 @@ from atp import (
     PlayerMatch_Walkover,
     PlayerMatch_Set,
 )
-from page3_game_set_match_2 import get_game_count_rows
+from season import get_seasons
 from helpers import *
 
 
@@ -38,14 +39,15 @@ class Page:
         player: Player
         reason: str
 
-    djokovic: PlayerStats
-    mensik: PlayerStats
+    djokovic: PlayerStats | None
+    "None if the player is not in the ranking (older editions)."
+    mensik: PlayerStats | None
     award_ineligibility: list[AwardIneligibility]
 
 
-def page7_fin(players: list[Player], date_from: str) -> Page:
-    djokovic = _get_player_stats(players, date_from, "Djokovic")
-    mensik = _get_player_stats(players, date_from, "Mensik")
+def page7_fin(players: list[Player], date_from: Date, date_to: Date) -> Page:
+    djokovic = _get_player_stats(players, date_from, date_to, "Djokovic")
+    mensik = _get_player_stats(players, date_from, date_to, "Mensik")
 
     award_ineligibility = list[Page.AwardIneligibility]()
 
@@ -63,19 +65,21 @@ def page7_fin(players: list[Player], date_from: str) -> Page:
 
 def _get_player_stats(
     players: list[Player],
-    date_from: str,
+    date_from: Date,
+    date_to: Date,
     name_last: str,
-) -> Page.PlayerStats:
-    p = find(players, lambda p: p.name_last == name_last)
+) -> Page.PlayerStats | None:
+    seasons = get_seasons(players, date_from, date_to)
+    matching = [s for s in seasons if s.player.name_last == name_last]
+    assert len(matching) <= 1, "Multiple matching"
 
-    tournaments = list[Page.PlayerStats.Tournament]()
-    match_count = 0
-    set_count = 0
+    if not matching:
+        return None
 
-    for t in p.career_tournaments:
-        if t.date < date_from:
-            continue
+    season = matching[0]
+    tournaments = list[Page.PlayerStats.Tournament]()
 
+    for t in season.tournaments:
         matches = list[PlayerMatch]()
 
         for m in t.matches:
@@ -95,20 +99,13 @@ def _get_player_stats(
 
         # 'PZ' (prize only) tournaments may not have any matches.
         if t.matches:
-            m = t.matches[-1]
-            is_win = m.round.id == "F" and m.win_loss == "W"
+            is_win = t in season.titles
             tournaments.append(Page.PlayerStats.Tournament(t, matches, is_win))
 
-        for m in t.matches:
-            match_count += 1
-            sets = getattr(m, "sets", None)
-
-            if sets is not None:
-                assert isinstance(sets, list)
-                set_count += len(sets)
-
-    game_rows = get_game_count_rows(players, date_from)
-    games_p = find(game_rows, lambda r: r.player.id == p.id)
-    game_count = games_p.count_all
-
-    return Page.PlayerStats(p, tournaments, match_count, set_count, game_count)
+    return Page.PlayerStats(
+        season.player,
+        tournaments,
+        season.match_count,
+        season.set_count,
+        season.game_count,
+    )
@@ -0,0 +1,343 @@
+import numpy as np
+from typing import Callable, Iterator, assert_never
+from dataclasses import dataclass
+from atp import (
+    Date,
+    Player,
+    PlayerTournament,
+    PlayerMatch_Played,
+    PlayerMatch_Walkover,
+    PlayerMatch_Retire,
+    PlayerMatch_Default,
+    PlayerMatch_Bye,
+    PlayerMatch_NotPlayed,
+    PlayerMatch_Set,
+)
+from helpers import filter_award_max_NO_can_receive_award_check
+
+
+@dataclass
+class PlayerSeason:
+    "Everything that the pages need from the player matches in a given period."
+
+    Data = (
+        PlayerMatch_Played
+        | PlayerMatch_Walkover
+        | PlayerMatch_Retire
+        | PlayerMatch_Default
+    )
+    "Match with an opponent."
+
+    @dataclass
+    class Versus:
+        tournament: PlayerTournament
+        match: "PlayerSeason.Data"
+        opponent: Player
+        "Opponent from the same player set."
+
+    player: Player
+    tournaments: list[PlayerTournament]
+    titles: list[PlayerTournament]
+    versus: list[Versus]
+
+    match_count: int = 0
+    "All entries: byes and unplayed matches included."
+    win_count: int = 0
+    "Matches with an opponent, walkovers included."
+    loss_count: int = 0
+    "Matches with an opponent, walkovers included."
+    walkover_count: int = 0
+    retire_count: int = 0
+    default_count: int = 0
+    set_count: int = 0
+
+    game_win_count: int = 0
+    game_win_tie_break_count: int = 0
+    game_lost_count: int = 0
+    game_lost_tie_break_count: int = 0
+
+    @property
+    def title_count(self) -> int:
+        return len(self.titles)
+
+    @property
+    def game_count(self) -> int:
+        return (
+            self.game_win_count
+            + self.game_win_tie_break_count
+            + self.game_lost_count
+            + self.game_lost_tie_break_count
+        )
+
+
+def get_seasons(
+    players: list[Player],
+    date_from: Date | None,
+    date_to: Date | None = None,
+) -> list[PlayerSeason]:
+    """
+    Season of every player in [date_from, date_to), in the 'players' order.
+    Cached for a given player set and dates. Do not modify the result.
+    """
+    key = (tuple(p.id for p in players), date_from, date_to)
+    result = _CACHE.get(key)
+
+    if result is not None:
+        return result
+
+    id_to_player = {p.id: p for p in players}
+    result = [_get_season(p, id_to_player, date_from, date_to) for p in players]
+    _CACHE[key] = result
+    return result
+
+
+_CACHE = dict[tuple[tuple[str, ...], Date | None, Date | None], list[PlayerSeason]]()
+
+
+# MARK: Head to head
+
+
+class HeadToHead:
+    """
+    Matches between the players from the same set.
+
+    Sparse: only the pairs that played are stored, keyed by 'index1 * n + index2'
+    where index is the position in the player list and index1 < index2.
+    """
+
+    @dataclass
+    class Pair:
+        player1: Player
+        player2: Player
+        player1_wins: list[PlayerSeason.Versus]
+        "Matches won by player1 (from the player1 side)."
+        player2_wins: list[PlayerSeason.Versus]
+        "Matches won by player2 (from the player2 side)."
+
+        @property
+        def match_count(self) -> int:
+            return len(self.player1_wins) + len(self.player2_wins)
+
+        @property
+        def player1_win_count(self) -> int:
+            return len(self.player1_wins)
+
+        @property
+        def player2_win_count(self) -> int:
+            return len(self.player2_wins)
+
+    def __init__(self, seasons: list[PlayerSeason]) -> None:
+        self._players = [s.player for s in seasons]
+        self._id_to_index = {p.id: i for i, p in enumerate(self._players)}
+        # Insertion order = order of the 1st match in 'seasons'.
+        self._key_to_pair = dict[int, HeadToHead.Pair]()
+
+        for s in seasons:
+            for v in s.versus:
+                # Every match is in the 'versus' of both players,
+                # it is enough to store it from the winner side.
+                pair = self._get_or_create_pair(s.player, v.opponent)
+
+                if v.match.win_loss == "L":
+                    continue
+
+                assert v.match.win_loss == "W", v.match.win_loss
+
+                if pair.player1 is s.player:
+                    pair.player1_wins.append(v)
+                else:
+                    pair.player2_wins.append(v)
+
+    def __len__(self) -> int:
+        return len(self._key_to_pair)
+
+    def __iter__(self) -> Iterator[Pair]:
+        return iter(self._key_to_pair.values())
+
+    def get(self, player1: Player, player2: Player) -> Pair | None:
+        key = self._get_key(player1, player2)
+        return self._key_to_pair.get(key)
+
+    def get_most_played(
+        self,
+        count: int,
+        predicate: Callable[[Pair], bool] | None = None,
+    ) -> list[Pair]:
+        "Pairs with the 'count' highest match counts (ties included)."
+        pairs = (p for p in self if predicate is None or predicate(p))
+        return filter_award_max_NO_can_receive_award_check(
+            pairs,
+            count,
+            key=lambda p: p.match_count,
+        )
+
+    def get_rank_heatmap(
+        self,
+        ranks: dict[str, int],
+        rank_first: int,
+        rank_last: int,
+        bin_size: int = 1,
+    ) -> np.ndarray:
+        """
+        Match count by player rank: result[player_bin][opponent_bin].
+        'ranks' are player id -> rank, unranked players are skipped.
+        Ranks are grouped into bins of 'bin_size', players outside of
+        [rank_first, rank_last] are skipped.
+        """
+        bin_count = (rank_last - rank_first) // bin_size + 1
+        result = np.zeros((bin_count, bin_count), dtype=np.int64)
+
+        if not self._key_to_pair:
+            return result
+
+        pairs = list(self)
+        rank1 = np.array([ranks.get(p.player1.id, 0) for p in pairs])
+        rank2 = np.array([ranks.get(p.player2.id, 0) for p in pairs])
+        counts = np.array([p.match_count for p in pairs])
+
+        is_in_range = (
+            (rank1 >= rank_first)
+            & (rank1 <= rank_last)
+            & (rank2 >= rank_first)
+            & (rank2 <= rank_last)
+        )
+
+        bin1 = (rank1[is_in_range] - rank_first) // bin_size
+        bin2 = (rank2[is_in_range] - rank_first) // bin_size
+        counts = counts[is_in_range]
+
+        # Both directions: player -> opponent and opponent -> player.
+        np.add.at(result, (bin1, bin2), counts)
+        np.add.at(result, (bin2, bin1), counts)
+        return result
+
+    def _get_key(self, player1: Player, player2: Player) -> int:
+        index1 = self._id_to_index[player1.id]
+        index2 = self._id_to_index[player2.id]
+
+        if index2 < index1:
+            index1, index2 = index2, index1
+
+        return index1 * len(self._players) + index2
+
+    def _get_or_create_pair(self, player: Player, opponent: Player) -> Pair:
+        key = self._get_key(player, opponent)
+        pair = self._key_to_pair.get(key)
+
+        if pair is None:
+            pair = HeadToHead.Pair(player, opponent, [], [])
+            self._key_to_pair[key] = pair
+
+        return pair
+
+
+def get_head_to_head(
+    players: list[Player],
+    date_from: Date | None,
+    date_to: Date | None = None,
+) -> HeadToHead:
+    "Cached for a given player set and dates."
+    key = (tuple(p.id for p in players), date_from, date_to)
+    result = _HEAD_TO_HEAD_CACHE.get(key)
+
+    if result is None:
+        seasons = get_seasons(players, date_from, date_to)
+        result = HeadToHead(seasons)
+        _HEAD_TO_HEAD_CACHE[key] = result
+
+    return result
+
+
+_HEAD_TO_HEAD_CACHE = dict[tuple[tuple[str, ...], Date | None, Date | None], HeadToHead]()
+
+
+# MARK: Single pass
+
+
+def _get_season(
+    player: Player,
+    id_to_player: dict[str, Player],
+    date_from: Date | None,
+    date_to: Date | None,
+) -> PlayerSeason:
+    tournaments = player.get_tournaments(date_from, date_to)
+    result = PlayerSeason(player, tournaments, titles=[], versus=[])
+
+    for t in tournaments:
+        # 'PZ' (prize only) tournaments may not have any matches.
+        if t.matches:
+            m = t.matches[-1]
+
+            if m.round.id == "F" and m.win_loss == "W":
+                result.titles.append(t)
+
+        for m in t.matches:
+            result.match_count += 1
+
+            if isinstance(m, PlayerSeason.Data):
+                if m.win_loss == "W":
+                    result.win_count += 1
+                elif m.win_loss == "L":
+                    result.loss_count += 1
+                else:
+                    assert_never(m.win_loss)
+
+                o = id_to_player.get(m.opponent.id)
+
+                # None -> player not in the top 10/50/100 etc.
+                if o is not None:
+                    result.versus.append(PlayerSeason.Versus(t, m, o))
+
+                if isinstance(m, PlayerMatch_Walkover):
+                    result.walkover_count += 1
+                    continue
+
+                if isinstance(m, PlayerMatch_Retire):
+                    result.retire_count += 1
+                elif isinstance(m, PlayerMatch_Default):
+                    result.default_count += 1
+
+                _add_sets(result, m.sets)
+
+            elif isinstance(m, PlayerMatch_Bye | PlayerMatch_NotPlayed):
+                pass
+            else:
+                assert_never(m)
+
+    return result
+
+
+def _add_sets(result: PlayerSeason, sets: list[PlayerMatch_Set]):
+    result.set_count += len(sets)
+
+    for s in sets:
+        result.game_win_count += s.player
+        result.game_lost_count += s.opponent
+
+        if s.tie_break is not None:
+            # 7:6
+            if s.player == 7:
+                assert s.opponent == 6
+                result.game_win_count -= 1
+                result.game_win_tie_break_count += 1
+            elif s.opponent == 7:
+                assert s.player == 6
+                result.game_lost_count -= 1
+                result.game_lost_tie_break_count += 1
+            # 1:0
+            elif s.player == 1:
+                assert s.opponent == 0
+                result.game_win_tie_break_count += 1
+            elif s.opponent == 1:
+                assert s.player == 0
+                result.game_lost_tie_break_count += 1
+            # 4:3 - ATP Next Gen 2024
+            elif s.player == 4:
+                assert s.opponent == 3
+                result.game_win_tie_break_count += 1
+            elif s.opponent == 4:
+                assert s.player == 3
+                result.game_lost_tie_break_count += 1
+            # Other?
+            else:
+                assert False, "Tie-break requires 7:6, 4:3, 1:0"
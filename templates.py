@@ -0,0 +1,47 @@
+import os
+import glob
+from jinja2 import (
+    Environment,
+    FileSystemLoader,
+    FileSystemBytecodeCache,
+    select_autoescape,
+)
+
+TEMPLATE_DIR_PATH = "."
+TEMPLATE_PATTERN = "page*.html"
+BYTECODE_CACHE_PATH = "template_cache"
+"Compiled templates, invalidated by Jinja when the template source changes."
+
+_ENVIRONMENT: Environment | None = None
+
+
+def get_template_environment() -> Environment:
+    """
+    Environment shared by all of the pages in this process: every template
+    (and 'page.html' with the shared macros) is compiled only once.
+    """
+    global _ENVIRONMENT
+
+    if _ENVIRONMENT is None:
+        os.makedirs(BYTECODE_CACHE_PATH, exist_ok=True)
+        _ENVIRONMENT = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR_PATH),
+            autoescape=select_autoescape(),
+            bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_PATH),
+            # Templates do not change during the run.
+            auto_reload=False,
+        )
+
+    return _ENVIRONMENT
+
+
+def precompile_templates() -> list[str]:
+    "Compile all of the templates into the bytecode cache. Returns template names."
+    env = get_template_environment()
+    pattern = os.path.join(TEMPLATE_DIR_PATH, TEMPLATE_PATTERN)
+    result = sorted(os.path.basename(p) for p in glob.glob(pattern))
+
+    for name in result:
+        env.get_template(name)
+
+    return result